@@ -9,140 +9,198 @@ __doc__ = "Analyze elevation marker direction vectors to solve 45° orientation
 
 # Standard pyRevit imports
 from pyrevit import revit, DB, UI, script
+from pyrevit.framework import List
+from System import Type
 import math
 
 # Get current document
 doc = revit.doc
 uidoc = revit.uidoc
 
+# FamilyInstance members probed once on the class instead of per marker
+HAS_FACING_FLIPPED = hasattr(DB.FamilyInstance, 'FacingFlipped')
+HAS_HAND_FLIPPED = hasattr(DB.FamilyInstance, 'HandFlipped')
+HAS_HAND_ORIENTATION = hasattr(DB.FamilyInstance, 'HandOrientation')
+
+# Fixed-precision templates reused for every vector/point readout
+VECTOR_FORMAT = "(%.4f, %.4f, %.4f)"
+POINT_FORMAT = "(%.2f, %.2f, %.2f)"
+
+def plan_angle_degrees(x, y, _atan2=math.atan2, _degrees=math.degrees):
+    """
+    Angle of a direction in the XY plane, in degrees from the X-axis
+    Pass raw vector components - atan2 is scale-invariant, so there is no
+    need to Normalize() the vector first
+    """
+    # math functions bound as defaults so each call uses local lookups
+    return _degrees(_atan2(y, x))
+
 def analyze_elevation_marker_direction():
     """
     Diagnostic function to analyze elevation marker direction properties
     """
-    print("=== ELEVATION MARKER DIRECTION DIAGNOSTIC ===")
+    # Buffer report lines and emit them with a single print at the end
+    output_lines = []
+    log = output_lines.append
     
-    # Get one elevation marker for detailed analysis
-    elevation_markers = list(DB.FilteredElementCollector(doc).OfClass(DB.ElevationMarker).ToElements())
-    family_instances = DB.FilteredElementCollector(doc).OfClass(DB.FamilyInstance).ToElements()
-    
-    elevation_families = []
-    for instance in family_instances:
-        try:
-            if instance.Symbol and instance.Symbol.Family:
-                family_name = instance.Symbol.Family.Name.lower()
-                if 'elevation' in family_name or 'marker' in family_name:
-                    elevation_families.append(instance)
-        except:
-            continue
-    
-    print("Found {} ElevationMarker objects".format(len(elevation_markers)))
-    print("Found {} FamilyInstance elevation markers".format(len(elevation_families)))
-    
-    # Analyze first FamilyInstance elevation marker
-    if elevation_families:
-        marker = elevation_families[0]
-        print("\n--- FAMILYINSTANCE ELEVATION MARKER ANALYSIS ---")
-        print("Marker ID: {}".format(marker.Id.Value))
-        print("Family Name: {}".format(marker.Symbol.Family.Name))
-        
-        # Check location
-        if marker.Location and hasattr(marker.Location, 'Point'):
-            location = marker.Location.Point
-            print("Location: ({:.2f}, {:.2f}, {:.2f})".format(location.X, location.Y, location.Z))
+    try:
+        log("=== ELEVATION MARKER DIRECTION DIAGNOSTIC ===")
         
-        # CRITICAL: Check FacingOrientation
-        try:
-            facing_orientation = marker.FacingOrientation
-            print("FacingOrientation: ({:.4f}, {:.4f}, {:.4f})".format(
-                facing_orientation.X, facing_orientation.Y, facing_orientation.Z))
-            
-            # Calculate angle from facing orientation
-            angle_rad = math.atan2(facing_orientation.Y, facing_orientation.X)
-            angle_deg = math.degrees(angle_rad)
-            print("Facing Angle: {:.2f} degrees from X-axis".format(angle_deg))
-            
-        except Exception as e:
-            print("ERROR getting FacingOrientation: {}".format(str(e)))
+        # Get one elevation marker for detailed analysis
+        # Single collector pass: class filter runs first (quick), then the family
+        # name match runs natively in Revit instead of per-instance Python checks
+        class_filter = DB.ElementMulticlassFilter(
+            List[Type]([DB.ElevationMarker, DB.FamilyInstance]))
+        family_name_id = DB.ElementId(DB.BuiltInParameter.ALL_MODEL_FAMILY_NAME)
+        name_filter = DB.LogicalOrFilter(
+            DB.ElementParameterFilter(
+                DB.ParameterFilterRuleFactory.CreateContainsRule(family_name_id, "elevation")),
+            DB.ElementParameterFilter(
+                DB.ParameterFilterRuleFactory.CreateContainsRule(family_name_id, "marker")))
+        # ElevationMarker objects have no family name parameter - let them through by class
+        marker_filter = DB.LogicalOrFilter(DB.ElementClassFilter(DB.ElevationMarker), name_filter)
         
-        # Check flip status
-        try:
-            facing_flipped = marker.FacingFlipped if hasattr(marker, 'FacingFlipped') else "N/A"
-            hand_flipped = marker.HandFlipped if hasattr(marker, 'HandFlipped') else "N/A"
-            print("FacingFlipped: {}, HandFlipped: {}".format(facing_flipped, hand_flipped))
-        except Exception as e:
-            print("ERROR getting flip status: {}".format(str(e)))
+        # Iterate the collector directly - no intermediate element list
+        candidates = (DB.FilteredElementCollector(doc)
+                      .WherePasses(class_filter)
+                      .WherePasses(marker_filter))
         
-        # Check hand orientation
-        try:
-            hand_orientation = marker.HandOrientation if hasattr(marker, 'HandOrientation') else None
-            if hand_orientation:
-                print("HandOrientation: ({:.4f}, {:.4f}, {:.4f})".format(
-                    hand_orientation.X, hand_orientation.Y, hand_orientation.Z))
-                
-                hand_angle_rad = math.atan2(hand_orientation.Y, hand_orientation.X)
-                hand_angle_deg = math.degrees(hand_angle_rad)
-                print("Hand Angle: {:.2f} degrees from X-axis".format(hand_angle_deg))
-        except Exception as e:
-            print("ERROR getting HandOrientation: {}".format(str(e)))
-    
-    # Analyze first ElevationMarker object
-    if elevation_markers:
-        marker = elevation_markers[0]
-        print("\n--- ELEVATIONMARKER OBJECT ANALYSIS ---")
-        print("Marker ID: {}".format(marker.Id.Value))
-        print("Current View Count: {}".format(marker.CurrentViewCount))
+        elevation_markers = []
+        elevation_families = []
+        for element in candidates:
+            if isinstance(element, DB.ElevationMarker):
+                elevation_markers.append(element)
+            else:
+                elevation_families.append(element)
         
-        # Check location
-        if marker.Location and hasattr(marker.Location, 'Point'):
-            location = marker.Location.Point
-            print("Location: ({:.2f}, {:.2f}, {:.2f})".format(location.X, location.Y, location.Z))
+        log("Found {} ElevationMarker objects".format(len(elevation_markers)))
+        log("Found {} FamilyInstance elevation markers".format(len(elevation_families)))
         
-        # Analyze hosted elevation views
-        for i in range(marker.CurrentViewCount):
+        # Analyze first FamilyInstance elevation marker
+        if elevation_families:
+            marker = elevation_families[0]
+            log("\n--- FAMILYINSTANCE ELEVATION MARKER ANALYSIS ---")
+            log("Marker ID: {}".format(marker.Id.Value))
+            symbol = marker.Symbol
+            family = symbol.Family if symbol is not None else None
+            log("Family Name: {}".format(family.Name if family is not None else "N/A"))
+            
+            # Check location
+            marker_location = marker.Location
+            if type(marker_location) is DB.LocationPoint:
+                location = marker_location.Point
+                log("Location: " + POINT_FORMAT % (location.X, location.Y, location.Z))
+            
+            # CRITICAL: Check FacingOrientation
             try:
-                view_id = marker.GetViewId(i)
-                if view_id and view_id != DB.ElementId.InvalidElementId:
-                    elev_view = doc.GetElement(view_id)
+                facing_orientation = marker.FacingOrientation
+                log("FacingOrientation: " + VECTOR_FORMAT % (
+                    facing_orientation.X, facing_orientation.Y, facing_orientation.Z))
+                
+                # Calculate angle from facing orientation
+                angle_deg = plan_angle_degrees(facing_orientation.X, facing_orientation.Y)
+                log("Facing Angle: %.2f degrees from X-axis" % angle_deg)
+                
+            except Exception as e:
+                log("ERROR getting FacingOrientation: {}".format(str(e)))
+            
+            # Check flip status
+            try:
+                facing_flipped = marker.FacingFlipped if HAS_FACING_FLIPPED else "N/A"
+                hand_flipped = marker.HandFlipped if HAS_HAND_FLIPPED else "N/A"
+                log("FacingFlipped: {}, HandFlipped: {}".format(facing_flipped, hand_flipped))
+            except Exception as e:
+                log("ERROR getting flip status: {}".format(str(e)))
+            
+            # Check hand orientation
+            try:
+                hand_orientation = marker.HandOrientation if HAS_HAND_ORIENTATION else None
+                if hand_orientation:
+                    log("HandOrientation: " + VECTOR_FORMAT % (
+                        hand_orientation.X, hand_orientation.Y, hand_orientation.Z))
+                    
+                    hand_angle_deg = plan_angle_degrees(hand_orientation.X, hand_orientation.Y)
+                    log("Hand Angle: %.2f degrees from X-axis" % hand_angle_deg)
+            except Exception as e:
+                log("ERROR getting HandOrientation: {}".format(str(e)))
+        
+        # Analyze first ElevationMarker object
+        if elevation_markers:
+            marker = elevation_markers[0]
+            log("\n--- ELEVATIONMARKER OBJECT ANALYSIS ---")
+            log("Marker ID: {}".format(marker.Id.Value))
+            log("Current View Count: {}".format(marker.CurrentViewCount))
+            
+            # Check location
+            marker_location = marker.Location
+            if type(marker_location) is DB.LocationPoint:
+                location = marker_location.Point
+                log("Location: " + POINT_FORMAT % (location.X, location.Y, location.Z))
+            
+            # Gather hosted view ids first so all views resolve in one collector pass
+            hosted_view_ids = []
+            for i in range(marker.CurrentViewCount):
+                try:
+                    view_id = marker.GetViewId(i)
+                    # Plain integer compare against InvalidElementId (-1)
+                    if view_id.Value != -1:
+                        hosted_view_ids.append((i, view_id))
+                except Exception as e:
+                    log("  ERROR reading view id {}: {}".format(i, str(e)))
+            
+            views_by_id = {}
+            if hosted_view_ids:
+                view_id_list = List[DB.ElementId]([view_id for i, view_id in hosted_view_ids])
+                # A collector must have a filter applied before it can be iterated
+                for view in DB.FilteredElementCollector(doc, view_id_list).OfClass(DB.View):
+                    views_by_id[view.Id.Value] = view
+            
+            # Analyze hosted elevation views
+            for i, view_id in hosted_view_ids:
+                try:
+                    elev_view = views_by_id.get(view_id.Value)
                     if elev_view:
-                        print("\n  Elevation View {}: {}".format(i, elev_view.Name))
+                        log("\n  Elevation View {}: {}".format(i, elev_view.Name))
                         
                         # CRITICAL: Check ViewDirection
                         try:
+                            # Read components once into a tuple - no further proxy access
                             view_direction = elev_view.ViewDirection
-                            print("  ViewDirection: ({:.4f}, {:.4f}, {:.4f})".format(
-                                view_direction.X, view_direction.Y, view_direction.Z))
+                            view_xyz = (view_direction.X, view_direction.Y, view_direction.Z)
+                            log("  ViewDirection: " + VECTOR_FORMAT % view_xyz)
                             
                             # Calculate angle from view direction
-                            view_angle_rad = math.atan2(view_direction.Y, view_direction.X)
-                            view_angle_deg = math.degrees(view_angle_rad)
-                            print("  View Angle: {:.2f} degrees from X-axis".format(view_angle_deg))
+                            view_angle_deg = plan_angle_degrees(view_xyz[0], view_xyz[1])
+                            log("  View Angle: %.2f degrees from X-axis" % view_angle_deg)
                             
                         except Exception as e:
-                            print("  ERROR getting ViewDirection: {}".format(str(e)))
+                            log("  ERROR getting ViewDirection: {}".format(str(e)))
                         
                         # Check other view directions
                         try:
                             up_direction = elev_view.UpDirection
+                            up_xyz = (up_direction.X, up_direction.Y, up_direction.Z)
                             right_direction = elev_view.RightDirection
-                            print("  UpDirection: ({:.4f}, {:.4f}, {:.4f})".format(
-                                up_direction.X, up_direction.Y, up_direction.Z))
-                            print("  RightDirection: ({:.4f}, {:.4f}, {:.4f})".format(
-                                right_direction.X, right_direction.Y, right_direction.Z))
+                            right_xyz = (right_direction.X, right_direction.Y, right_direction.Z)
+                            log("  UpDirection: " + VECTOR_FORMAT % up_xyz)
+                            log("  RightDirection: " + VECTOR_FORMAT % right_xyz)
                         except Exception as e:
-                            print("  ERROR getting view directions: {}".format(str(e)))
+                            log("  ERROR getting view directions: {}".format(str(e)))
                             
-            except Exception as e:
-                print("  ERROR analyzing view {}: {}".format(i, str(e)))
-    
-    print("\n=== DIAGNOSTIC COMPLETE ===")
-    print("Next step: Compare these angles with expected angles after 90° building rotation")
-    print("If facing/view directions show 45° offset, we've found the root cause!")
+                except Exception as e:
+                    log("  ERROR analyzing view {}: {}".format(i, str(e)))
+        
+        log("\n=== DIAGNOSTIC COMPLETE ===")
+        log("Next step: Compare these angles with expected angles after 90° building rotation")
+        log("If facing/view directions show 45° offset, we've found the root cause!")
+    finally:
+        print("\n".join(output_lines))
 
 def main():
     """Main diagnostic function"""
     try:
-        with revit.Transaction("Elevation Marker Direction Diagnostic"):
-            analyze_elevation_marker_direction()
+        # Read-only analysis - no transaction needed
+        analyze_elevation_marker_direction()
         
         UI.TaskDialog.Show("Diagnostic Complete", 
                           "Elevation marker direction analysis complete!\n"
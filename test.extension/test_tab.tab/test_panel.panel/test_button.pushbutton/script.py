@@ -14,30 +14,130 @@ __doc__ = "Transform model elements with special focus on elevation markers and
 # Standard pyRevit imports
 from pyrevit import revit, DB, UI, script
 from pyrevit.framework import List
+from System import Type
+from itertools import islice
 import math
+import re
+import traceback
 
 # Get current document and UI document
 doc = revit.doc
 uidoc = revit.uidoc
 
+# Per-element progress output - off by default, each print refreshes the output window
+DEBUG = False
 
-def separate_hosted_elements(document, element_ids):
+# Type dispatch sets built once at import - exact type() hits skip reflection-based checks
+TRANSFORMABLE_LOCATION_TYPES = frozenset([DB.LocationPoint, DB.LocationCurve])
+SKETCH_BASED_TYPES = frozenset([DB.FootPrintRoof, DB.ExtrusionRoof, DB.Floor, DB.Ceiling])
+SKETCH_BASED_CLASSES = (DB.Floor, DB.RoofBase, DB.Ceiling)
+
+# Family name keywords used to identify marker family instances
+ELEVATION_KEYWORDS = ('elevation', 'marker', 'callout')
+SECTION_KEYWORDS = ('section', 'callout', 'detail', 'marker')
+# Same keywords compiled for the Python-side bucketing - one C-level search per name
+ELEVATION_NAME_PATTERN = re.compile('|'.join(re.escape(k) for k in ELEVATION_KEYWORDS), re.IGNORECASE)
+SECTION_NAME_PATTERN = re.compile('|'.join(re.escape(k) for k in SECTION_KEYWORDS), re.IGNORECASE)
+
+# Degrees -> radians factor folded once - avoids a math attribute lookup + call per use
+DEG_TO_RAD = math.pi / 180.0
+
+# Revit constants resolved once instead of per loop iteration
+INVALID_ELEMENT_ID = DB.ElementId.InvalidElementId
+DEFAULT_ELEVATION_NAMES = ('north', 'south', 'east', 'west')
+
+# INCLUDE specific building element categories - VERIFIED FOR REVIT 2026
+MODEL_CATEGORIES = [
+    # Core building elements
+    DB.BuiltInCategory.OST_Walls,
+    DB.BuiltInCategory.OST_Floors, 
+    DB.BuiltInCategory.OST_Roofs,
+    DB.BuiltInCategory.OST_Ceilings,
+    DB.BuiltInCategory.OST_Doors,
+    DB.BuiltInCategory.OST_Windows,
+    # Building components
+    DB.BuiltInCategory.OST_Stairs,
+    DB.BuiltInCategory.OST_Railings,
+    DB.BuiltInCategory.OST_CurtainWallPanels,
+    DB.BuiltInCategory.OST_CurtainWallMullions,
+    # Furniture and fixtures
+    DB.BuiltInCategory.OST_Furniture,
+    DB.BuiltInCategory.OST_Casework,
+    DB.BuiltInCategory.OST_PlumbingFixtures,
+    DB.BuiltInCategory.OST_LightingFixtures,
+    DB.BuiltInCategory.OST_ElectricalFixtures,
+    # Equipment
+    DB.BuiltInCategory.OST_MechanicalEquipment,
+    DB.BuiltInCategory.OST_ElectricalEquipment,
+    # Structural elements
+    DB.BuiltInCategory.OST_StructuralFraming,
+    DB.BuiltInCategory.OST_StructuralColumns,
+    DB.BuiltInCategory.OST_StructuralFoundation,
+    # Site and generic
+    DB.BuiltInCategory.OST_GenericModel,
+    DB.BuiltInCategory.OST_Entourage,
+    DB.BuiltInCategory.OST_Parking,
+    DB.BuiltInCategory.OST_Site,
+    DB.BuiltInCategory.OST_Topography,
+    DB.BuiltInCategory.OST_Mass,
+]
+
+# Annotation categories - collected in the same pass as model elements
+ANNOTATION_CATEGORIES = [
+    DB.BuiltInCategory.OST_Dimensions,
+    DB.BuiltInCategory.OST_TextNotes,
+    DB.BuiltInCategory.OST_Tags,
+    DB.BuiltInCategory.OST_GenericAnnotation,
+    DB.BuiltInCategory.OST_Callouts,  # Add callouts
+    DB.BuiltInCategory.OST_DetailComponents,  # Add detail components
+]
+ANNOTATION_CATEGORY_VALUES = frozenset(int(category) for category in ANNOTATION_CATEGORIES)
+
+# Model + annotation categories as one .NET list, built once for the collector filter
+COLLECTED_CATEGORIES = List[DB.BuiltInCategory](MODEL_CATEGORIES + ANNOTATION_CATEGORIES)
+
+# Upper bound on memoized annotation endpoints - keeps memory flat on huge models
+POINT_CACHE_LIMIT = 10000
+
+
+def get_cached_element(document, element_id, element_cache):
+    """
+    Resolve an element id through a per-call cache so each id hits GetElement once
+    Only valid before elements are transformed - rotation may invalidate elements
+    """
+    key = element_id.Value
+    if key in element_cache:
+        return element_cache[key]
+    element = document.GetElement(element_id)
+    element_cache[key] = element
+    return element
+
+
+def separate_hosted_elements(document, element_ids, element_cache=None):
     """
     Separate hosted elements (doors, windows) from non-hosted elements
     Host elements should be transformed before their hosted elements
+    Returns .NET Lists so they can go straight into ElementTransformUtils
     """
-    hosted_elements = []
-    non_hosted_elements = []
+    hosted_elements = List[DB.ElementId]()
+    non_hosted_elements = List[DB.ElementId]()
+    if element_cache is None:
+        element_cache = {}
+    # Bound once so the loop skips the per-iteration method lookup
+    add_hosted = hosted_elements.Add
+    add_non_hosted = non_hosted_elements.Add
     
     for element_id in element_ids:
+        element = get_cached_element(document, element_id, element_cache)
         try:
-            element = document.GetElement(element_id)
-            if element and hasattr(element, 'Host') and element.Host is not None:
-                hosted_elements.append(element_id)
-            else:
-                non_hosted_elements.append(element_id)
-        except:
-            non_hosted_elements.append(element_id)  # Default to non-hosted
+            host = getattr(element, 'Host', None) if element is not None else None
+        except Exception:
+            # Runs after a failed rotation - a stale wrapper throws on Host access
+            host = None
+        if host is not None:
+            add_hosted(element_id)
+        else:
+            add_non_hosted(element_id)  # Default to non-hosted
     
     return hosted_elements, non_hosted_elements
 
@@ -46,42 +146,49 @@ def get_valid_elements(document, element_ids):
     """
     Get list of elements that still exist in the document
     Some elements may be invalidated during rotation
+    Returns a .NET List so it can go straight into ElementTransformUtils
     """
-    valid_elements = []
+    valid_elements = List[DB.ElementId]()
+    add_valid = valid_elements.Add
+    get_element = document.GetElement
     
+    # GetElement returns None for deleted ids, so no try/except is needed
     for element_id in element_ids:
-        try:
-            element = document.GetElement(element_id)
-            if element is not None:
-                valid_elements.append(element_id)
-        except:
-            continue
+        if get_element(element_id) is not None:
+            add_valid(element_id)
     
     return valid_elements
 
 
-def store_wall_joins(document, element_ids):
+def store_wall_joins(document, element_ids, element_cache=None):
     """
     Store wall-to-wall join relationships before transformation
     """
     wall_joins = []
+    if element_cache is None:
+        element_cache = {}
     
     try:
         # Get all walls from the element list
         walls = []
         for element_id in element_ids:
-            element = document.GetElement(element_id)
+            element = get_cached_element(document, element_id, element_cache)
             if element and isinstance(element, DB.Wall):
                 walls.append(element)
         
-        # Check which walls are joined to each other
-        for i, wall1 in enumerate(walls):
-            for j, wall2 in enumerate(walls[i+1:], i+1):
-                try:
-                    if DB.JoinGeometryUtils.AreElementsJoined(document, wall1, wall2):
-                        wall_joins.append((wall1.Id, wall2.Id))
-                except:
-                    continue
+        # Check which walls are joined to each other - one GetJoinedElements call per wall
+        # instead of probing every wall pair
+        wall_id_values = set(wall.Id.Value for wall in walls)
+        for wall in walls:
+            try:
+                wall_id_value = wall.Id.Value
+                for joined_id in DB.JoinGeometryUtils.GetJoinedElements(document, wall):
+                    joined_value = joined_id.Value
+                    # Record each pair once, from the lower id side
+                    if joined_value > wall_id_value and joined_value in wall_id_values:
+                        wall_joins.append((wall.Id, joined_id))
+            except Exception:
+                continue
     except Exception as e:
         print("Error storing wall joins: {}".format(str(e)))
     
@@ -93,49 +200,71 @@ def clean_wall_constraints(document, element_ids):
     Clean up wall constraints that may cause errors after transformation
     """
     print("Cleaning wall constraints...")
-    walls_processed = 0
     
+    # Resolve every wall once up front instead of re-fetching all walls for each wall
+    all_walls = []
     for element_id in element_ids:
         try:
             element = document.GetElement(element_id)
             if element and isinstance(element, DB.Wall):
-                # Try to auto-join walls at their endpoints
-                try:
-                    # Get all other walls to check for auto-joining
-                    all_walls = [document.GetElement(eid) for eid in element_ids 
-                                if document.GetElement(eid) and isinstance(document.GetElement(eid), DB.Wall)]
-                    
-                    for other_wall in all_walls:
-                        if other_wall.Id != element.Id:
-                            try:
-                                # Let Revit auto-join walls if they're close
-                                if not DB.JoinGeometryUtils.AreElementsJoined(document, element, other_wall):
-                                    # Check if endpoints are close (within 0.1 feet for precision)
-                                    if hasattr(element, 'Location') and hasattr(other_wall, 'Location'):
-                                        if isinstance(element.Location, DB.LocationCurve) and isinstance(other_wall.Location, DB.LocationCurve):
-                                            curve1 = element.Location.Curve
-                                            curve2 = other_wall.Location.Curve
-                                            
-                                            endpoints1 = [curve1.GetEndPoint(0), curve1.GetEndPoint(1)]
-                                            endpoints2 = [curve2.GetEndPoint(0), curve2.GetEndPoint(1)]
-                                            
-                                            for ep1 in endpoints1:
-                                                for ep2 in endpoints2:
-                                                    distance = ep1.DistanceTo(ep2)
-                                                    if distance < 0.1:  # Very close - should auto-join
-                                                        DB.JoinGeometryUtils.JoinGeometry(document, element, other_wall)
-                                                        print("  Auto-joined walls {} and {} (distance: {:.3f})".format(
-                                                            element.Id.Value, other_wall.Id.Value, distance))
-                                                        break
-                            except:
-                                continue
-                                
-                    walls_processed += 1
-                except:
-                    continue
-        except:
+                all_walls.append(element)
+        except Exception:
             continue
     
+    # Bucket wall endpoints into a grid of tolerance-sized cells so only walls whose
+    # endpoints share a neighbouring cell are compared, instead of probing every pair
+    tolerance = 0.1  # Very close - should auto-join
+    endpoint_grid = {}
+    for index, wall in enumerate(all_walls):
+        location = wall.Location
+        if type(location) is not DB.LocationCurve:
+            continue
+        curve = location.Curve
+        for end in (0, 1):
+            point = curve.GetEndPoint(end)
+            xyz = (point.X, point.Y, point.Z)
+            cell = (int(math.floor(xyz[0] / tolerance)),
+                    int(math.floor(xyz[1] / tolerance)),
+                    int(math.floor(xyz[2] / tolerance)))
+            endpoint_grid.setdefault(cell, []).append((index, xyz))
+    
+    # Closest squared endpoint distance per candidate wall pair (lower index first)
+    tolerance_squared = tolerance * tolerance
+    candidate_pairs = {}
+    neighbour_offsets = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+    for (cx, cy, cz), entries in endpoint_grid.items():
+        for dx, dy, dz in neighbour_offsets:
+            neighbours = endpoint_grid.get((cx + dx, cy + dy, cz + dz))
+            if not neighbours:
+                continue
+            for index1, xyz1 in entries:
+                for index2, xyz2 in neighbours:
+                    if index1 >= index2:
+                        continue
+                    distance_squared = ((xyz1[0] - xyz2[0]) ** 2 +
+                                        (xyz1[1] - xyz2[1]) ** 2 +
+                                        (xyz1[2] - xyz2[2]) ** 2)
+                    if distance_squared < tolerance_squared:
+                        pair = (index1, index2)
+                        if distance_squared < candidate_pairs.get(pair, tolerance_squared):
+                            candidate_pairs[pair] = distance_squared
+    
+    # Only walls with touching endpoints reach the join API
+    for (index1, index2), distance_squared in candidate_pairs.items():
+        element = all_walls[index1]
+        other_wall = all_walls[index2]
+        try:
+            # Let Revit auto-join walls if they're close
+            if not DB.JoinGeometryUtils.AreElementsJoined(document, element, other_wall):
+                DB.JoinGeometryUtils.JoinGeometry(document, element, other_wall)
+                # Root taken only for the pairs that are actually reported
+                print("  Auto-joined walls {} and {} (distance: {:.3f})".format(
+                    element.Id.Value, other_wall.Id.Value, math.sqrt(distance_squared)))
+        except Exception:
+            continue
+    
+    walls_processed = len(all_walls)
+    
     print("Wall constraint cleanup completed: {} walls processed".format(walls_processed))
 
 
@@ -168,24 +297,30 @@ def restore_wall_joins(document, wall_joins):
                         # Try auto-join at wall ends as fallback
                         try:
                             # Get wall endpoints and see if they're close
-                            if hasattr(wall1, 'Location') and hasattr(wall2, 'Location'):
-                                if isinstance(wall1.Location, DB.LocationCurve) and isinstance(wall2.Location, DB.LocationCurve):
-                                    curve1 = wall1.Location.Curve
-                                    curve2 = wall2.Location.Curve
-                                    
-                                    # Check if wall endpoints are close (within 1 foot)
-                                    endpoints1 = [curve1.GetEndPoint(0), curve1.GetEndPoint(1)]
-                                    endpoints2 = [curve2.GetEndPoint(0), curve2.GetEndPoint(1)]
-                                    
-                                    for ep1 in endpoints1:
-                                        for ep2 in endpoints2:
-                                            distance = ep1.DistanceTo(ep2)
-                                            if distance < 1.0:  # Within 1 foot
-                                                print("    Walls are close at endpoints (distance: {:.3f}), attempting join".format(distance))
-                                                DB.JoinGeometryUtils.JoinGeometry(document, wall1, wall2)
-                                                restored_count += 1
-                                                break
-                        except:
+                            location1 = wall1.Location
+                            location2 = wall2.Location
+                            if type(location1) is DB.LocationCurve and type(location2) is DB.LocationCurve:
+                                curve1 = location1.Curve
+                                curve2 = location2.Curve
+                                
+                                # Endpoint coordinates read once into floats
+                                endpoints1 = [(point.X, point.Y, point.Z)
+                                              for point in (curve1.GetEndPoint(0), curve1.GetEndPoint(1))]
+                                endpoints2 = [(point.X, point.Y, point.Z)
+                                              for point in (curve2.GetEndPoint(0), curve2.GetEndPoint(1))]
+                                
+                                # Check if wall endpoints are close (within 1 foot) - squared
+                                # distance against 1.0 squared, so no sqrt per comparison
+                                closest_squared = min(
+                                    (x1 - x2) ** 2 + (y1 - y2) ** 2 + (z1 - z2) ** 2
+                                    for x1, y1, z1 in endpoints1
+                                    for x2, y2, z2 in endpoints2)
+                                if closest_squared < 1.0:  # Within 1 foot
+                                    print("    Walls are close at endpoints (distance: {:.3f}), attempting join".format(
+                                        math.sqrt(closest_squared)))
+                                    DB.JoinGeometryUtils.JoinGeometry(document, wall1, wall2)
+                                    restored_count += 1
+                        except Exception:
                             continue
                 else:
                     print("  Walls {} and {} already joined".format(wall1_id.Value, wall2_id.Value))
@@ -197,117 +332,85 @@ def restore_wall_joins(document, wall_joins):
     print("Wall join restoration completed: {}/{} joins restored".format(restored_count, len(wall_joins)))
 
 
-def get_model_elements(document):
+def get_model_elements(document, element_cache=None):
     """
     Get all transformable building elements - FIXED to include actual building elements
+    Annotations are binned from the same collector pass
+    Collected model elements are stored in element_cache (if given) so later
+    pre-transform steps skip the id -> element round-trip
+    Returns (model element ids, annotation element ids)
     """
     
-    elements_to_transform = []
-    
-    # INCLUDE specific building element categories - VERIFIED FOR REVIT 2026
-    included_categories = [
-        # Core building elements
-        DB.BuiltInCategory.OST_Walls,
-        DB.BuiltInCategory.OST_Floors, 
-        DB.BuiltInCategory.OST_Roofs,
-        DB.BuiltInCategory.OST_Ceilings,
-        DB.BuiltInCategory.OST_Doors,
-        DB.BuiltInCategory.OST_Windows,
-        # Building components
-        DB.BuiltInCategory.OST_Stairs,
-        DB.BuiltInCategory.OST_Railings,
-        DB.BuiltInCategory.OST_CurtainWallPanels,
-        DB.BuiltInCategory.OST_CurtainWallMullions,
-        # Furniture and fixtures
-        DB.BuiltInCategory.OST_Furniture,
-        DB.BuiltInCategory.OST_Casework,
-        DB.BuiltInCategory.OST_PlumbingFixtures,
-        DB.BuiltInCategory.OST_LightingFixtures,
-        DB.BuiltInCategory.OST_ElectricalFixtures,
-        # Equipment
-        DB.BuiltInCategory.OST_MechanicalEquipment,
-        DB.BuiltInCategory.OST_ElectricalEquipment,
-        # Structural elements
-        DB.BuiltInCategory.OST_StructuralFraming,
-        DB.BuiltInCategory.OST_StructuralColumns,
-        DB.BuiltInCategory.OST_StructuralFoundation,
-        # Site and generic
-        DB.BuiltInCategory.OST_GenericModel,
-        DB.BuiltInCategory.OST_Entourage,
-        DB.BuiltInCategory.OST_Parking,
-        DB.BuiltInCategory.OST_Site,
-        DB.BuiltInCategory.OST_Topography,
-        DB.BuiltInCategory.OST_Mass,
-    ]
+    # .NET Lists so the ids can go straight into ElementTransformUtils without copying
+    elements_to_transform = List[DB.ElementId]()
+    annotation_ids = List[DB.ElementId]()
     
     print("Analyzing elements for transformation...")
     
-    # Collect elements from each included category
-    for category in included_categories:
+    # Collect model and annotation categories in a single native collector pass
+    try:
+        category_filter = DB.ElementMulticategoryFilter(COLLECTED_CATEGORIES)
+        # Inverted class filter keeps View elements (e.g. callout views) out natively,
+        # they cannot go through ElementTransformUtils with the rest
+        not_view_filter = DB.ElementClassFilter(DB.View, True)
+        collector = DB.FilteredElementCollector(document)
+        collector.WherePasses(category_filter).WherePasses(not_view_filter).WhereElementIsNotElementType()
+    except Exception as e:
+        print("Could not build category collector: {}".format(str(e)))
+        return elements_to_transform, annotation_ids
+    
+    category_counts = {}
+    # Bound once - these run for every collected element
+    add_element = elements_to_transform.Add
+    add_annotation = annotation_ids.Add
+    
+    for element in collector:
         try:
-            # Verify category exists before using it
-            category_name = str(category).split('.')[-1]  # Get just the OST_* part
-            print("Checking category: {}".format(category_name))
+            # Annotations are handled by update_annotations_v3 after the views
+            category = element.Category
+            if category and category.Id.Value in ANNOTATION_CATEGORY_VALUES:
+                add_annotation(element.Id)
+                continue
             
-            collector = DB.FilteredElementCollector(document)
-            collector.OfCategory(category).WhereElementIsNotElementType()
+            # Check if element can be transformed
+            can_transform = False
             
-            category_elements = collector.ToElements()
-            category_count = 0
+            # Method 1: Elements with Location property (most common)
+            location = element.Location
+            if location is not None:
+                if type(location) in TRANSFORMABLE_LOCATION_TYPES:
+                    can_transform = True
             
-            # Debug: show what elements are in this category
-            if len(category_elements) > 0:
-                print("  Found {} elements in category {}".format(len(category_elements), category_name))
-                for i, elem in enumerate(category_elements[:3]):  # Show first 3
-                    print("    Element {}: {} (Type: {})".format(elem.Id.Value, elem.Name if hasattr(elem, 'Name') else 'No Name', type(elem).__name__))
+            # Method 2: Sketch-based elements (roofs, floors) might not have standard Location
+            elif type(element) in SKETCH_BASED_TYPES or isinstance(element, SKETCH_BASED_CLASSES):
+                # These are sketch-based and can be transformed via ElementTransformUtils
+                can_transform = True
+                if DEBUG:
+                    print("  Found sketch-based element: {} (Type: {})".format(element.Id.Value, type(element).__name__))
             
-            for element in category_elements:
-                try:
-                    # Check if element can be transformed
-                    can_transform = False
-                    
-                    # Method 1: Elements with Location property (most common)
-                    if hasattr(element, 'Location') and element.Location is not None:
-                        location_type = type(element.Location).__name__
-                        if location_type in ['LocationPoint', 'LocationCurve']:
-                            can_transform = True
-                    
-                    # Method 2: Sketch-based elements (roofs, floors) might not have standard Location
-                    elif (isinstance(element, (DB.Floor, DB.RoofBase, DB.Ceiling)) or 
-                          type(element).__name__ in ['FootPrintRoof', 'ExtrusionRoof', 'Floor', 'Ceiling']):
-                        # These are sketch-based and can be transformed via ElementTransformUtils
-                        can_transform = True
-                        print("  Found sketch-based element: {} (Type: {})".format(element.Id.Value, type(element).__name__))
-                    
-                    # Method 3: Family instances should have geometry even without Location
-                    elif isinstance(element, DB.FamilyInstance):
-                        # Check if it has geometry/can be placed
-                        try:
-                            geom = element.get_Geometry(DB.Options())
-                            if geom is not None:
-                                can_transform = True
-                        except:
-                            pass
-                    
-                    if can_transform:
-                        elements_to_transform.append(element.Id)
-                        category_count += 1
-                        
-                except:
-                    continue
+            # Method 3: Family instances without a Location are still placed instances -
+            # the class check replaces a get_Geometry probe that built full geometry per element
+            elif isinstance(element, DB.FamilyInstance):
+                can_transform = True
             
-            if category_count > 0:
-                print("Found {} transformable elements in category {}".format(category_count, category_name))
+            if can_transform:
+                element_id = element.Id
+                add_element(element_id)
+                if element_cache is not None:
+                    element_cache[element_id.Value] = element
+                category_name = category.Name if category else "Unknown"
+                category_counts[category_name] = category_counts.get(category_name, 0) + 1
                 
-        except Exception as e:
-            category_name = str(category).split('.')[-1] if hasattr(category, '__str__') else 'Unknown'
-            print("Could not collect category {}: {}".format(category_name, str(e)))
+        except Exception:
             continue
     
+    for category_name in sorted(category_counts):
+        print("Found {} transformable elements in category {}".format(category_counts[category_name], category_name))
+    
     # Debug: Check what types we actually collected
-    if elements_to_transform:
+    if DEBUG and elements_to_transform:
         element_types = {}
-        for i, element_id in enumerate(elements_to_transform[:50]):  # Check first 50
+        for i, element_id in enumerate(islice(elements_to_transform, 50)):  # Check first 50
             try:
                 element = document.GetElement(element_id)
                 if element:
@@ -315,253 +418,267 @@ def get_model_elements(document):
                     category_name = element.Category.Name if element.Category else "Unknown"
                     key = "{} ({})".format(elem_type, category_name)
                     element_types[key] = element_types.get(key, 0) + 1
-            except:
+            except Exception:
                 continue
         
         print("Element types found: {}".format(element_types))
     
     print("Found {} total elements to transform".format(len(elements_to_transform)))
-    return elements_to_transform
+    print("Found {} annotations".format(len(annotation_ids)))
+    return elements_to_transform, annotation_ids
 
 
-def transform_elements_robust(document, element_ids, transform, rotation_degrees=0, rotation_origin=None):
+def transform_elements_robust(document, element_ids, transform, rotation_degrees=0, rotation_origin=None, element_cache=None,
+                             commit_every=50):
     """
     Robust element transformation using proper Revit API methods
     Handles hosted elements, wall joins, sketch constraints, and element invalidation
+    element_cache may carry elements already resolved by the caller (must be pre-transform)
+    commit_every sizes the SubTransaction batches used when the bulk translation fails
     """
     
+    if commit_every < 1:
+        raise ValueError("commit_every must be at least 1, got {}".format(commit_every))
+    
     if not element_ids:
         return 0
     
     original_count = len(element_ids)
     transformed_count = 0
     
+    # Read the transform once - every step below branches on these flags
+    translation_vector = transform.Origin
+    tx, ty, tz = translation_vector.X, translation_vector.Y, translation_vector.Z
+    has_translation = bool(tx or ty or tz)
+    has_rotation = rotation_degrees != 0 and rotation_origin is not None
+    
+    # Identity transform - nothing moves, so skip classification and join bookkeeping
+    if not (has_translation or has_rotation):
+        return original_count
+    
     # Separate elements by type to handle constraints properly
     sketch_based_elements = []  # Roofs, floors, ceilings
-    regular_elements = []
+    regular_elements = List[DB.ElementId]()  # Passed straight to ElementTransformUtils
+    
+    # Elements resolved before any transformation, shared by the pre-transform helpers
+    if element_cache is None:
+        element_cache = {}
     
     for element_id in element_ids:
         try:
-            element = document.GetElement(element_id)
+            element = get_cached_element(document, element_id, element_cache)
             if element:
                 if isinstance(element, (DB.Floor, DB.RoofBase, DB.Ceiling)):
                     sketch_based_elements.append(element_id)
                 else:
-                    regular_elements.append(element_id)
-        except:
-            regular_elements.append(element_id)  # Default to regular
+                    regular_elements.Add(element_id)
+        except Exception:
+            regular_elements.Add(element_id)  # Default to regular
     
     print("Regular elements: {}, Sketch-based elements: {}".format(len(regular_elements), len(sketch_based_elements)))
     
     # Store wall joins before transformation (only for regular elements)
-    wall_joins = store_wall_joins(document, regular_elements)
+    wall_joins = store_wall_joins(document, regular_elements, element_cache)
+    
+    # Only a failed bulk rotation can leave invalidated elements behind
+    rotation_failed = False
     
     try:
         # Step 1: Apply rotation if needed
-        if rotation_degrees != 0 and rotation_origin is not None:
+        if has_rotation:
             print("Applying rotation of {} degrees...".format(rotation_degrees))
             print("Rotation center: ({:.2f}, {:.2f}, {:.2f})".format(
                 rotation_origin.X, rotation_origin.Y, rotation_origin.Z))
             
-            # Create rotation axis (Z-axis through rotation center)
+            # Rotation axis and angle built once - reused by every fallback below
             axis_start = rotation_origin
             axis_end = DB.XYZ(rotation_origin.X, rotation_origin.Y, rotation_origin.Z + 10)
             rotation_axis = DB.Line.CreateBound(axis_start, axis_end)
-            
-            # Convert degrees to radians
-            rotation_radians = rotation_degrees * 3.14159265359 / 180.0
+            rotation_radians = rotation_degrees * DEG_TO_RAD
             print("Rotation radians: {:.4f}".format(rotation_radians))
             
             # Debug: Analyze element types and positions before rotation
-            print("\nAnalyzing elements before rotation:")
-            element_types = {}
-            sample_positions = []
-            for i, element_id in enumerate(element_ids[:10]):  # Check first 10
-                try:
-                    element = document.GetElement(element_id)
-                    if element:
-                        elem_type = type(element).__name__
-                        element_types[elem_type] = element_types.get(elem_type, 0) + 1
-                        
-                        if element.Location and i < 5:  # Store positions for first 5
-                            if hasattr(element.Location, 'Point'):
-                                point = element.Location.Point
-                                sample_positions.append((element_id.Value, point.X, point.Y, point.Z, elem_type))
-                                print("Element {} before: ({:.2f}, {:.2f}, {:.2f}) - {}".format(
-                                    element_id.Value, point.X, point.Y, point.Z, elem_type))
-                            elif hasattr(element.Location, 'Curve'):
-                                curve = element.Location.Curve
-                                start = curve.GetEndPoint(0)
-                                sample_positions.append((element_id.Value, start.X, start.Y, start.Z, elem_type + "(curve)"))
-                                print("Element {} (curve) before: ({:.2f}, {:.2f}, {:.2f}) - {}".format(
-                                    element_id.Value, start.X, start.Y, start.Z, elem_type))
-                except:
-                    continue
-            
-            print("Element types to rotate: {}".format(element_types))
-            
-            # Separate hosted and non-hosted elements from REGULAR elements only
-            hosted_elements, non_hosted_elements = separate_hosted_elements(document, regular_elements)
-            print("Non-hosted elements: {}, Hosted elements: {}".format(
-                len(non_hosted_elements), len(hosted_elements)))
-            
-            # Rotate non-hosted elements first (hosts before hosted)
-            if non_hosted_elements:
-                non_hosted_list = List[DB.ElementId](non_hosted_elements)
-                print("Rotating {} non-hosted elements around axis from ({:.2f}, {:.2f}, {:.2f}) to ({:.2f}, {:.2f}, {:.2f})".format(
-                    len(non_hosted_elements), 
-                    rotation_axis.GetEndPoint(0).X, rotation_axis.GetEndPoint(0).Y, rotation_axis.GetEndPoint(0).Z,
-                    rotation_axis.GetEndPoint(1).X, rotation_axis.GetEndPoint(1).Y, rotation_axis.GetEndPoint(1).Z))
-                try:
-                    DB.ElementTransformUtils.RotateElements(document, non_hosted_list, rotation_axis, rotation_radians)
-                    print("Non-hosted elements rotation successful!")
-                except Exception as rot_e:
-                    print("Non-hosted rotation failed, trying individual: {}".format(str(rot_e)))
-                    for element_id in non_hosted_elements:
-                        try:
-                            DB.ElementTransformUtils.RotateElement(document, element_id, rotation_axis, rotation_radians)
-                        except:
-                            continue
-            
-            # Rotate hosted elements (doors, windows, etc.)
-            if hosted_elements:
-                hosted_list = List[DB.ElementId](hosted_elements)
-                print("Rotating {} hosted elements".format(len(hosted_elements)))
-                try:
-                    DB.ElementTransformUtils.RotateElements(document, hosted_list, rotation_axis, rotation_radians)
-                    print("Hosted elements rotation successful!")
-                except Exception as rot_e:
-                    print("Hosted rotation failed, trying individual: {}".format(str(rot_e)))
-                    for element_id in hosted_elements:
-                        try:
-                            DB.ElementTransformUtils.RotateElement(document, element_id, rotation_axis, rotation_radians)
-                        except:
-                            continue
-            
+            if DEBUG:
+                print("\nAnalyzing elements before rotation:")
+                element_types = {}
+                sample_positions = []
+                for i, element_id in enumerate(islice(element_ids, 10)):  # Check first 10
+                    try:
+                        element = get_cached_element(document, element_id, element_cache)
+                        if element:
+                            elem_type = type(element).__name__
+                            element_types[elem_type] = element_types.get(elem_type, 0) + 1
+                            
+                            location = element.Location
+                            if location and i < 5:  # Store positions for first 5
+                                location_type = type(location)
+                                if location_type is DB.LocationPoint:
+                                    point = location.Point
+                                    sample_positions.append((element_id.Value, point.X, point.Y, point.Z, elem_type))
+                                    print("Element {} before: ({:.2f}, {:.2f}, {:.2f}) - {}".format(
+                                        element_id.Value, point.X, point.Y, point.Z, elem_type))
+                                elif location_type is DB.LocationCurve:
+                                    curve = location.Curve
+                                    start = curve.GetEndPoint(0)
+                                    sample_positions.append((element_id.Value, start.X, start.Y, start.Z, elem_type + "(curve)"))
+                                    print("Element {} (curve) before: ({:.2f}, {:.2f}, {:.2f}) - {}".format(
+                                        element_id.Value, start.X, start.Y, start.Z, elem_type))
+                    except Exception:
+                        continue
+                
+                print("Element types to rotate: {}".format(element_types))
+                
+            # Rotate all regular elements in one call - hosted elements ride along with their hosts
+            print("Rotating {} regular elements around axis from ({:.2f}, {:.2f}, {:.2f}) to ({:.2f}, {:.2f}, {:.2f})".format(
+                len(regular_elements),
+                rotation_axis.GetEndPoint(0).X, rotation_axis.GetEndPoint(0).Y, rotation_axis.GetEndPoint(0).Z,
+                rotation_axis.GetEndPoint(1).X, rotation_axis.GetEndPoint(1).Y, rotation_axis.GetEndPoint(1).Z))
+            try:
+                if regular_elements:
+                    DB.ElementTransformUtils.RotateElements(document, regular_elements, rotation_axis, rotation_radians)
+                print("Combined rotation successful!")
+            except Exception as combined_e:
+                rotation_failed = True
+                print("Combined rotation failed, splitting hosts and hosted: {}".format(str(combined_e)))
+                
+                # Separate hosted and non-hosted elements from REGULAR elements only
+                # No element_cache - the failed rotation may have left its wrappers stale
+                hosted_elements, non_hosted_elements = separate_hosted_elements(document, regular_elements)
+                print("Non-hosted elements: {}, Hosted elements: {}".format(
+                    len(non_hosted_elements), len(hosted_elements)))
+                
+                # Rotate non-hosted elements first (hosts before hosted)
+                if non_hosted_elements:
+                    print("Rotating {} non-hosted elements around axis from ({:.2f}, {:.2f}, {:.2f}) to ({:.2f}, {:.2f}, {:.2f})".format(
+                        len(non_hosted_elements), 
+                        rotation_axis.GetEndPoint(0).X, rotation_axis.GetEndPoint(0).Y, rotation_axis.GetEndPoint(0).Z,
+                        rotation_axis.GetEndPoint(1).X, rotation_axis.GetEndPoint(1).Y, rotation_axis.GetEndPoint(1).Z))
+                    try:
+                        DB.ElementTransformUtils.RotateElements(document, non_hosted_elements, rotation_axis, rotation_radians)
+                        print("Non-hosted elements rotation successful!")
+                    except Exception as rot_e:
+                        print("Non-hosted rotation failed, trying individual: {}".format(str(rot_e)))
+                        for element_id in non_hosted_elements:
+                            try:
+                                DB.ElementTransformUtils.RotateElement(document, element_id, rotation_axis, rotation_radians)
+                            except Exception:
+                                continue
+                
+                # Rotate hosted elements (doors, windows, etc.)
+                if hosted_elements:
+                    print("Rotating {} hosted elements".format(len(hosted_elements)))
+                    try:
+                        DB.ElementTransformUtils.RotateElements(document, hosted_elements, rotation_axis, rotation_radians)
+                        print("Hosted elements rotation successful!")
+                    except Exception as rot_e:
+                        print("Hosted rotation failed, trying individual: {}".format(str(rot_e)))
+                        for element_id in hosted_elements:
+                            try:
+                                DB.ElementTransformUtils.RotateElement(document, element_id, rotation_axis, rotation_radians)
+                            except Exception:
+                                continue
+                
             # Debug: Check multiple elements after rotation to verify movement
-            print("\nChecking element positions after rotation:")
-            checked_count = 0
-            for element_id in element_ids[:5]:  # Check first 5 elements
-                try:
-                    element = document.GetElement(element_id)
-                    if element and element.Location:
-                        if hasattr(element.Location, 'Point'):
-                            after_point = element.Location.Point
-                            print("Element {} after rotation: ({:.2f}, {:.2f}, {:.2f}) - Type: {}".format(
-                                element_id.Value, after_point.X, after_point.Y, after_point.Z, 
-                                type(element).__name__))
-                            checked_count += 1
-                        elif hasattr(element.Location, 'Curve'):
-                            curve = element.Location.Curve
-                            start_point = curve.GetEndPoint(0)
-                            print("Element {} (curve) start after rotation: ({:.2f}, {:.2f}, {:.2f}) - Type: {}".format(
-                                element_id.Value, start_point.X, start_point.Y, start_point.Z,
-                                type(element).__name__))
-                            checked_count += 1
-                except:
-                    continue
-            print("Checked {} elements for position changes".format(checked_count))
-            
+            if DEBUG:
+                print("\nChecking element positions after rotation:")
+                checked_count = 0
+                for element_id in islice(element_ids, 5):  # Check first 5 elements
+                    try:
+                        element = document.GetElement(element_id)
+                        location = element.Location if element else None
+                        if location:
+                            location_type = type(location)
+                            if location_type is DB.LocationPoint:
+                                after_point = location.Point
+                                print("Element {} after rotation: ({:.2f}, {:.2f}, {:.2f}) - Type: {}".format(
+                                    element_id.Value, after_point.X, after_point.Y, after_point.Z, 
+                                    type(element).__name__))
+                                checked_count += 1
+                            elif location_type is DB.LocationCurve:
+                                curve = location.Curve
+                                start_point = curve.GetEndPoint(0)
+                                print("Element {} (curve) start after rotation: ({:.2f}, {:.2f}, {:.2f}) - Type: {}".format(
+                                    element_id.Value, start_point.X, start_point.Y, start_point.Z,
+                                    type(element).__name__))
+                                checked_count += 1
+                    except Exception:
+                        continue
+                print("Checked {} elements for position changes".format(checked_count))
+                
             # Step 1.5: Handle sketch-based elements separately (after regular elements)
             if sketch_based_elements:
                 print("\\nProcessing {} sketch-based elements (roofs, floors, ceilings)...".format(len(sketch_based_elements)))
                 print("WARNING: Sketch-based elements may have constraints that prevent rotation")
                 print("Will attempt transformation with constraint-safe methods")
                 
-                for sketch_id in sketch_based_elements:
-                    try:
-                        sketch_element = document.GetElement(sketch_id)
-                        if sketch_element:
-                            print("  Processing sketch element: {} (Type: {})".format(
-                                sketch_id.Value, type(sketch_element).__name__))
-                            
-                            # For sketch-based elements, try individual transformation
-                            sketch_list = List[DB.ElementId]([sketch_id])
-                            
-                            try:
-                                # For sketch-based elements, use most careful approach
-                                # Constraint errors often happen with rotation, so try translation first
-                                
-                                transformation_success = False
-                                
-                                # Method 1: Try translation only first (safest for constrained elements)
-                                if transform.Origin.GetLength() > 0.001:
-                                    try:
-                                        DB.ElementTransformUtils.MoveElement(document, sketch_id, transform.Origin)
-                                        print("    Sketch element translated successfully")
-                                        transformation_success = True
-                                        transformed_count += 1
-                                    except Exception as trans_e:
-                                        print("    Sketch element translation failed: {}".format(str(trans_e)))
-                                
-                                # Method 2: Only try rotation if translation succeeded and element allows it
-                                if transformation_success and rotation_degrees != 0:
-                                    try:
-                                        # Create rotation transform around element's own center to minimize constraint conflicts
-                                        element_center = None
-                                        if hasattr(sketch_element, 'Location') and sketch_element.Location:
-                                            if hasattr(sketch_element.Location, 'Point'):
-                                                element_center = sketch_element.Location.Point
-                                        
-                                        # Use element center if available, otherwise building center
-                                        rot_center = element_center if element_center else rotation_origin
-                                        
-                                        axis_start = rot_center
-                                        axis_end = DB.XYZ(rot_center.X, rot_center.Y, rot_center.Z + 10)
-                                        rotation_axis = DB.Line.CreateBound(axis_start, axis_end)
-                                        rotation_radians = rotation_degrees * 3.14159265359 / 180.0
-                                        
-                                        DB.ElementTransformUtils.RotateElement(document, sketch_id, rotation_axis, rotation_radians)
-                                        print("    Sketch element rotated around its center")
-                                        
-                                    except Exception as rot_e:
-                                        print("    Sketch element rotation failed (constraints): {}".format(str(rot_e)))
-                                        # Translation succeeded, so this is still partial success
-                                        pass
-                                
-                                # If no transformation succeeded, try the fallback
-                                if not transformation_success:
-                                    print("    WARNING: Sketch element {} transformation completely failed due to constraints".format(sketch_id.Value))
-                                    # Continue with other elements - don't fail the whole operation
-                                
-                            except Exception as sketch_e:
-                                print("    Sketch element processing failed: {}".format(str(sketch_e)))
-                                # Continue with other elements
-                                continue
-                                
-                    except Exception as e:
-                        print("  Error processing sketch element {}: {}".format(sketch_id.Value, str(e)))
-                        continue
+                # Bulk path: rotate all sketch elements about the building axis in one call,
+                # same as regular elements - Step 2 then translates them with everything else
+                sketch_id_list = List[DB.ElementId](sketch_based_elements)
+                try:
+                    DB.ElementTransformUtils.RotateElements(document, sketch_id_list, rotation_axis, rotation_radians)
+                    print("Bulk sketch-based rotation successful!")
+                except Exception as sketch_bulk_e:
+                    rotation_failed = True
+                    print("Bulk sketch-based rotation failed, trying individual: {}".format(str(sketch_bulk_e)))
+                    
+                    # Rotation only, about the same building axis as the bulk path -
+                    # Step 2 translates sketch elements along with everything else
+                    for sketch_id in sketch_based_elements:
+                        try:
+                            DB.ElementTransformUtils.RotateElement(document, sketch_id, rotation_axis, rotation_radians)
+                            if DEBUG:
+                                print("    Sketch element {} rotated around building axis".format(sketch_id.Value))
+                        except Exception as rot_e:
+                            # Continue with other elements - don't fail the whole operation
+                            print("    Sketch element {} rotation failed (constraints): {}".format(
+                                sketch_id.Value, str(rot_e)))
+                            continue
         
         # Step 2: Apply translation if needed  
-        translation_vector = transform.Origin
-        if not (translation_vector.X == 0 and translation_vector.Y == 0 and translation_vector.Z == 0):
-            print("Applying translation: ({}, {}, {})...".format(
-                translation_vector.X, translation_vector.Y, translation_vector.Z))
+        if has_translation:
+            print("Applying translation: ({}, {}, {})...".format(tx, ty, tz))
             
-            # Get fresh element list after rotation (some may be invalidated)
-            valid_elements = get_valid_elements(document, element_ids)
-            valid_element_list = List[DB.ElementId](valid_elements)
+            # Re-resolve ids only if the rotation fallback ran (some may be invalidated)
+            valid_elements = get_valid_elements(document, element_ids) if rotation_failed else element_ids
             
             try:
-                DB.ElementTransformUtils.MoveElements(document, valid_element_list, translation_vector)
+                DB.ElementTransformUtils.MoveElements(document, valid_elements, translation_vector)
                 print("Bulk translation successful!")
                 transformed_count = len(valid_elements)
             except Exception as trans_e:
-                print("Bulk translation failed, trying individual: {}".format(str(trans_e)))
-                # Try individual translation
-                for element_id in valid_elements:
-                    try:
-                        # Check if element still exists
-                        element = document.GetElement(element_id)
-                        if element is not None:
+                print("Bulk translation failed, trying batches of {}: {}".format(commit_every, str(trans_e)))
+                transformed_count = 0
+                pending_ids = list(valid_elements)
+                for batch_start in range(0, len(pending_ids), commit_every):
+                    batch = pending_ids[batch_start:batch_start + commit_every]
+                    # SubTransaction bounds the rollback to this batch only
+                    batch_moved = False
+                    with DB.SubTransaction(document) as sub:
+                        try:
+                            sub.Start()
+                            DB.ElementTransformUtils.MoveElements(document, List[DB.ElementId](batch), translation_vector)
+                            sub.Commit()
+                            batch_moved = True
+                        except Exception as batch_e:
+                            if sub.HasStarted() and not sub.HasEnded():
+                                sub.RollBack()
+                            print("  Batch at {} failed, trying individual: {}".format(batch_start, str(batch_e)))
+                    if batch_moved:
+                        transformed_count += len(batch)
+                        continue
+                    
+                    # Try individual translation within the failed batch
+                    for element_id in batch:
+                        try:
+                            # valid_elements is already filtered (or rotation succeeded), and a
+                            # deleted id makes MoveElement throw - no GetElement existence check needed
                             DB.ElementTransformUtils.MoveElement(document, element_id, translation_vector)
                             transformed_count += 1
-                    except:
-                        continue
+                        except Exception:
+                            continue
         else:
             # Count valid elements after rotation
-            valid_elements = get_valid_elements(document, element_ids)
+            valid_elements = get_valid_elements(document, element_ids) if rotation_failed else element_ids
             transformed_count = len(valid_elements)
         
         # Step 3: Clean wall constraints and restore wall joins
@@ -590,42 +707,48 @@ def is_default_elevation_marker(document, marker):
             for i in range(4):  # Check all 4 possible indices (0-3)
                 try:
                     elev_view_id = marker.GetViewId(i)  # FIXED: Correct API method
-                    if elev_view_id and elev_view_id != DB.ElementId.InvalidElementId:
+                    if elev_view_id and elev_view_id != INVALID_ELEMENT_ID:
                         elev_view = document.GetElement(elev_view_id)
-                        if elev_view and hasattr(elev_view, 'Name'):
+                        if elev_view:
                             view_name = elev_view.Name.lower()
                             
                             # Check for default elevation names
-                            default_names = ['north', 'south', 'east', 'west']
-                            if view_name in default_names:
-                                print("    Identified as default elevation: {}".format(view_name))
+                            if view_name in DEFAULT_ELEVATION_NAMES:
+                                if DEBUG:
+                                    print("    Identified as default elevation: {}".format(view_name))
                                 return True
                             
                             # Check for templates like "Elevation 1 - North"
-                            if 'elevation' in view_name and any(dir in view_name for dir in default_names):
-                                print("    Identified as default elevation: {}".format(view_name))
+                            if 'elevation' in view_name and any(dir in view_name for dir in DEFAULT_ELEVATION_NAMES):
+                                if DEBUG:
+                                    print("    Identified as default elevation: {}".format(view_name))
                                 return True
-                except:
+                except Exception:
                     continue
             
             # Additional check: location near origin suggests default placement
-            if hasattr(marker, 'Location') and marker.Location:
-                if hasattr(marker.Location, 'Point'):
-                    marker_loc = marker.Location.Point
+            marker_location = marker.Location
+            if marker_location:
+                if type(marker_location) is DB.LocationPoint:
+                    marker_loc = marker_location.Point
                     # Default elevations often placed near project origin
                     if abs(marker_loc.X) < 50 and abs(marker_loc.Y) < 50:
-                        print("    Identified as default elevation: near origin ({:.1f}, {:.1f})".format(
-                            marker_loc.X, marker_loc.Y))
+                        if DEBUG:
+                            print("    Identified as default elevation: near origin ({:.1f}, {:.1f})".format(
+                                marker_loc.X, marker_loc.Y))
                         return True
         
         # For FamilyInstance markers - these are typically user-created
         # But check family name for elevation-related defaults
         elif isinstance(marker, DB.FamilyInstance):
-            if marker.Symbol and marker.Symbol.Family:
-                family_name = marker.Symbol.Family.Name.lower()
+            symbol = marker.Symbol
+            family = symbol.Family if symbol else None
+            if family:
+                family_name = family.Name.lower()
                 # Some default elevation families might have specific names
                 if 'default' in family_name or 'system' in family_name:
-                    print("    Identified as default elevation family: {}".format(family_name))
+                    if DEBUG:
+                        print("    Identified as default elevation family: {}".format(family_name))
                     return True
         
         return False
@@ -636,48 +759,115 @@ def is_default_elevation_marker(document, marker):
         return False
 
 
-def update_elevation_markers_v3(document, transform, rotation_degrees, building_center):
+def get_marker_family_instances(document):
     """
-    V7 - CORRECT ROTATION: Use building's actual rotation (90°), not arbitrary 45°
-    Problem: V6 used 45° when markers need same rotation as building (90°)
-    Solution: FamilyInstance markers rotate by building rotation amount around their center
+    Scan FamilyInstances once and bucket elevation and section marker families
+    Shared by the elevation and section marker updates so the document is only scanned once
     """
+    elevation_families = []
+    section_markers = []
     
-    print("=== V7 ELEVATION MARKER UPDATE - CORRECT ROTATION ===")
-    print("API-BASED FIX: Markers rotate by same amount as building ({}°)".format(rotation_degrees))
-    print("Building center: ({:.2f}, {:.2f}, {:.2f})".format(
-        building_center.X, building_center.Y, building_center.Z))
+    # Pre-filter natively on family name so only candidate markers reach Python
+    family_name_id = DB.ElementId(DB.BuiltInParameter.ALL_MODEL_FAMILY_NAME)
+    name_filters = List[DB.ElementFilter]()
+    for keyword in sorted(set(ELEVATION_KEYWORDS + SECTION_KEYWORDS)):
+        rule = DB.ParameterFilterRuleFactory.CreateContainsRule(family_name_id, keyword)
+        name_filters.Add(DB.ElementParameterFilter(rule))
     
-    # Get elevation markers
-    elevation_markers = list(DB.FilteredElementCollector(document).OfClass(DB.ElevationMarker).ToElements())
-    elevation_by_category = list(DB.FilteredElementCollector(document)
-                                .OfCategory(DB.BuiltInCategory.OST_ElevationMarks)
-                                .WhereElementIsNotElementType()
-                                .ToElements())
+    # Read-only scan, so the collector can be streamed instead of materialized
+    family_instances = (DB.FilteredElementCollector(document)
+                        .OfClass(DB.FamilyInstance)
+                        .WherePasses(DB.LogicalOrFilter(name_filters)))
     
-    family_instances = DB.FilteredElementCollector(document).OfClass(DB.FamilyInstance).ToElements()
-    elevation_families = []
+    # Classification cached per type id - instances of the same symbol share a family name
+    symbol_cache = {}
+    add_elevation = elevation_families.append
+    add_section = section_markers.append
     
     for instance in family_instances:
         try:
-            if instance.Symbol and instance.Symbol.Family:
-                family_name = instance.Symbol.Family.Name.lower()
-                elevation_keywords = ['elevation', 'marker', 'callout']
-                if any(keyword in family_name for keyword in elevation_keywords):
-                    elevation_families.append(instance)
-        except:
+            type_key = instance.GetTypeId().Value
+            classification = symbol_cache.get(type_key)
+            if classification is None:
+                symbol = instance.Symbol
+                family = symbol.Family if symbol else None
+                if family:
+                    # Patterns are case-insensitive, so the name needs no lower() copy
+                    family_name = family.Name
+                    classification = (family_name,
+                                      ELEVATION_NAME_PATTERN.search(family_name) is not None,
+                                      SECTION_NAME_PATTERN.search(family_name) is not None)
+                else:
+                    classification = (None, False, False)
+                symbol_cache[type_key] = classification
+            
+            family_name, is_elevation, is_section = classification
+            if is_elevation:
+                add_elevation(instance)
+            if is_section:
+                add_section(instance)
+                if DEBUG:
+                    print("  Found section marker: {} - {}".format(instance.Id.Value, family_name))
+        except Exception:
             continue
     
-    all_elevation_elements = []
-    all_elevation_elements.extend(elevation_markers)
-    all_elevation_elements.extend(elevation_by_category)
-    all_elevation_elements.extend(elevation_families)
+    return elevation_families, section_markers
+
+
+def get_crop_views(document):
+    """
+    Collect section and plan views in one collector pass
+    Views are materialized into lists because the updaters write CropBox while iterating
+    Returns (section views, plan views)
+    """
+    section_views = []
+    plan_views = []
     
-    unique_elevations = {}
-    for elem in all_elevation_elements:
-        unique_elevations[elem.Id.Value] = elem
+    view_filter = DB.ElementMulticlassFilter(List[Type]([DB.ViewSection, DB.ViewPlan]))
+    for view in DB.FilteredElementCollector(document).WherePasses(view_filter):
+        if type(view) is DB.ViewSection:
+            section_views.append(view)
+        else:
+            plan_views.append(view)
+    
+    return section_views, plan_views
+
+
+def update_elevation_markers_v3(document, transform, rotation_degrees, building_center, elevation_families, is_translation):
+    """
+    V7 - CORRECT ROTATION: Use building's actual rotation (90°), not arbitrary 45°
+    Problem: V6 used 45° when markers need same rotation as building (90°)
+    Solution: FamilyInstance markers rotate by building rotation amount around their center
+    """
+    
+    print("=== V7 ELEVATION MARKER UPDATE - CORRECT ROTATION ===")
+    print("API-BASED FIX: Markers rotate by same amount as building ({}°)".format(rotation_degrees))
+    if building_center is not None:
+        print("Building center: ({:.2f}, {:.2f}, {:.2f})".format(
+            building_center.X, building_center.Y, building_center.Z))
+    else:
+        print("Building center: not used (translation only)")
+    
+    # Get elevation markers - class and category in one collector, Revit dedupes natively
+    marker_filter = DB.LogicalOrFilter(
+        DB.ElementClassFilter(DB.ElevationMarker),
+        DB.ElementCategoryFilter(DB.BuiltInCategory.OST_ElevationMarks))
+    elevation_collector = (DB.FilteredElementCollector(document)
+                           .WherePasses(marker_filter)
+                           .WhereElementIsNotElementType())
+    
+    # Dedupe against family instance markers as elements are collected
+    final_elevation_list = []
+    seen_ids = set()
+    for elem in elevation_collector:
+        seen_ids.add(elem.Id.Value)
+        final_elevation_list.append(elem)
+    for elem in elevation_families:
+        id_value = elem.Id.Value
+        if id_value not in seen_ids:
+            seen_ids.add(id_value)
+            final_elevation_list.append(elem)
     
-    final_elevation_list = list(unique_elevations.values())
     print("Found {} total elevation elements".format(len(final_elevation_list)))
     
     # Filter out default elevation markers
@@ -697,29 +887,47 @@ def update_elevation_markers_v3(document, transform, rotation_degrees, building_
     # V7 FIX: Use building's actual rotation amount, not arbitrary 45°
     # Position: Move markers with translation only
     # Orientation: Rotate by SAME amount as building (maintain perpendicular relationship to walls)
-    marker_rotation_radians = math.radians(rotation_degrees)  # Same as building rotation
+    marker_rotation_radians = rotation_degrees * DEG_TO_RAD  # Same as building rotation
     
     print("V7 CORRECT FIX: Markers rotate same amount as building")
     print("Building rotation: {}°, Marker rotation: {}° (same as building)".format(
         rotation_degrees, rotation_degrees))
     
-    for marker in user_markers:
+    elevation_marker_objects = []
+    pending_markers = user_markers
+    
+    # Pure translation: every marker just moves, so one bulk call replaces the per-marker path
+    if is_translation and user_markers:
+        try:
+            marker_ids = List[DB.ElementId]([marker.Id for marker in user_markers])
+            DB.ElementTransformUtils.MoveElements(document, marker_ids, transform.Origin)
+            updated_count = len(user_markers)
+            pending_markers = []
+            print("Bulk translated {} elevation elements".format(updated_count))
+        except Exception as bulk_e:
+            print("Bulk elevation translation failed, updating markers individually: {}".format(str(bulk_e)))
+    
+    for marker in pending_markers:
         try:
-            print("Processing elevation element: {} (Type: {})".format(marker.Id.Value, type(marker).__name__))
+            if DEBUG:
+                print("Processing elevation element: {} (Type: {})".format(marker.Id.Value, type(marker).__name__))
             
             if isinstance(marker, DB.FamilyInstance):
                 # FamilyInstance elevation marker
-                if marker.Location and hasattr(marker.Location, 'Point'):
-                    print("  FamilyInstance Location type: LocationPoint")
+                marker_location = marker.Location
+                if type(marker_location) is DB.LocationPoint:
+                    if DEBUG:
+                        print("  FamilyInstance Location type: LocationPoint")
                     
                     # Step 1: Move marker to new position (translation only, no rotation yet)
-                    old_point = marker.Location.Point
+                    old_point = marker_location.Point
                     # Apply only translation part of transform
                     translation_vector = transform.Origin
                     new_point = old_point.Add(translation_vector)
-                    marker.Location.Point = new_point
-                    print("  FamilyInstance moved to ({:.2f}, {:.2f}, {:.2f})".format(
-                        new_point.X, new_point.Y, new_point.Z))
+                    marker_location.Point = new_point
+                    if DEBUG:
+                        print("  FamilyInstance moved to ({:.2f}, {:.2f}, {:.2f})".format(
+                            new_point.X, new_point.Y, new_point.Z))
                     
                     # Step 2: V7 FIX - Rotate by building's rotation amount around marker center
                     # Create rotation axis at marker's new position
@@ -728,44 +936,71 @@ def update_elevation_markers_v3(document, transform, rotation_degrees, building_
                         DB.XYZ(new_point.X, new_point.Y, new_point.Z + 10)
                     )
                     
-                    print("  V7 FIX: Rotating {}° around marker center ({:.2f}, {:.2f}) - same as building".format(
-                        rotation_degrees, new_point.X, new_point.Y))
+                    if DEBUG:
+                        print("  V7 FIX: Rotating {}° around marker center ({:.2f}, {:.2f}) - same as building".format(
+                            rotation_degrees, new_point.X, new_point.Y))
                     
                     DB.ElementTransformUtils.RotateElement(document, marker.Id, marker_rotation_axis, marker_rotation_radians)
-                    print("  SUCCESS: FamilyInstance rotated by building rotation amount")
+                    if DEBUG:
+                        print("  SUCCESS: FamilyInstance rotated by building rotation amount")
                     updated_count += 1
                     
             elif isinstance(marker, DB.ElevationMarker):
-                # ElevationMarker object - use recommended API approach
-                view_count = marker.CurrentViewCount
-                print("  ElevationMarker has {} elevation views".format(view_count))
-                
-                # For ElevationMarker objects, use the recommended API approach:
-                # ElementTransformUtils.RotateElement with the ElevationMarker
-                
-                # Step 1: Apply translation using ElementTransformUtils
-                translation_vector = transform.Origin
-                DB.ElementTransformUtils.MoveElement(document, marker.Id, translation_vector)
-                print("  ElevationMarker translated by ({:.2f}, {:.2f}, {:.2f})".format(
-                    translation_vector.X, translation_vector.Y, translation_vector.Z))
-                
-                # Step 2: V7 FIX - Rotate by building rotation around building center
-                # This is the recommended approach for ElevationMarker objects
-                building_rotation_axis = DB.Line.CreateBound(
-                    building_center, 
-                    DB.XYZ(building_center.X, building_center.Y, building_center.Z + 10)
-                )
-                
-                print("  V7 FIX: Rotating ElevationMarker {}° around building center - API recommended".format(rotation_degrees))
-                DB.ElementTransformUtils.RotateElement(document, marker.Id, building_rotation_axis, marker_rotation_radians)
-                print("  SUCCESS: ElevationMarker rotated by building rotation amount")
-                
-                updated_count += 1
+                # ElevationMarker object - batched below, all share the building center axis
+                if DEBUG:
+                    print("  ElevationMarker has {} elevation views".format(marker.CurrentViewCount))
+                elevation_marker_objects.append(marker)
                 
         except Exception as e:
             print("  ERROR processing elevation element {}: {}".format(marker.Id.Value, str(e)))
             continue
     
+    # ElevationMarker objects - use recommended API approach in bulk:
+    # one MoveElements + one RotateElements around the building center
+    if elevation_marker_objects:
+        translation_vector = transform.Origin
+        failed_ids = set()
+        
+        # Step 1: Apply translation using ElementTransformUtils
+        try:
+            marker_ids = List[DB.ElementId]([marker.Id for marker in elevation_marker_objects])
+            DB.ElementTransformUtils.MoveElements(document, marker_ids, translation_vector)
+            print("  {} ElevationMarkers translated by ({:.2f}, {:.2f}, {:.2f})".format(
+                len(elevation_marker_objects), translation_vector.X, translation_vector.Y, translation_vector.Z))
+        except Exception as move_e:
+            print("  Bulk ElevationMarker translation failed, trying individual: {}".format(str(move_e)))
+            for marker in elevation_marker_objects:
+                try:
+                    DB.ElementTransformUtils.MoveElement(document, marker.Id, translation_vector)
+                except Exception as e:
+                    print("  ERROR translating ElevationMarker {}: {}".format(marker.Id.Value, str(e)))
+                    failed_ids.add(marker.Id.Value)
+        
+        # Step 2: V7 FIX - Rotate by building rotation around building center
+        moved_markers = [marker for marker in elevation_marker_objects if marker.Id.Value not in failed_ids]
+        if moved_markers and building_center is not None:
+            building_rotation_axis = DB.Line.CreateBound(
+                building_center, 
+                DB.XYZ(building_center.X, building_center.Y, building_center.Z + 10)
+            )
+            print("  V7 FIX: Rotating {} ElevationMarkers {}° around building center - API recommended".format(
+                len(moved_markers), rotation_degrees))
+            try:
+                moved_ids = List[DB.ElementId]([marker.Id for marker in moved_markers])
+                DB.ElementTransformUtils.RotateElements(document, moved_ids, building_rotation_axis, marker_rotation_radians)
+            except Exception as rot_e:
+                print("  Bulk ElevationMarker rotation failed, trying individual: {}".format(str(rot_e)))
+                for marker in moved_markers:
+                    try:
+                        DB.ElementTransformUtils.RotateElement(document, marker.Id, building_rotation_axis, marker_rotation_radians)
+                    except Exception as e:
+                        print("  ERROR rotating ElevationMarker {}: {}".format(marker.Id.Value, str(e)))
+                        failed_ids.add(marker.Id.Value)
+        
+        marker_success = len(elevation_marker_objects) - len(failed_ids)
+        print("  SUCCESS: {} ElevationMarkers rotated by building rotation amount".format(marker_success))
+        updated_count += marker_success
+    
     print("=== ELEVATION UPDATE SUMMARY ===")
     print("Updated {} out of {} user-created elevation elements".format(updated_count, len(user_markers)))
     print("Skipped {} default elevation markers".format(len(default_markers)))
@@ -776,57 +1011,69 @@ def update_elevation_markers_v3(document, transform, rotation_degrees, building_
     return updated_count
 
 
-def update_section_views_v3(document, transform, rotation_degrees, building_center):
+def transform_view_crop_box(view, transform):
+    """
+    Apply the building transform to a view's crop box (shared by plan and section views)
+    The crop box transform contains the view's coordinate system, so the origin moves
+    and, for rotations, the view direction vectors rotate with the building
+    Returns True if the crop box was updated
+    """
+    crop_box = view.CropBox
+    if not crop_box:
+        return False
+    
+    # Composing the building transform onto the crop transform moves the origin
+    # and rotates the basis vectors in one native call; for pure translations
+    # the bases come through unchanged
+    crop_box.Transform = transform.Multiply(crop_box.Transform)
+    
+    # CropBox returns a copy, so the same box (Min/Max untouched) is written back
+    view.CropBox = crop_box
+    return True
+
+
+def update_section_views_v3(document, transform, rotation_degrees, building_center, section_markers, section_views):
     """
     V7 - CORRECT ROTATION FOR SECTION MARKERS
     Same fix as elevation markers: use building's actual rotation (90°), not 45°
+    section_views are collected up front by get_crop_views
     """
     
     print("=== V7 SECTION VIEW UPDATE - CORRECT ROTATION ===")
     
-    section_views = DB.FilteredElementCollector(document).OfClass(DB.ViewSection).ToElements()
     print("Found {} section views to process".format(len(section_views)))
     updated_count = 0
     
-    # Find and transform section markers
-    section_markers = []
-    family_instances = DB.FilteredElementCollector(document).OfClass(DB.FamilyInstance).ToElements()
-    
-    for instance in family_instances:
-        try:
-            if instance.Symbol and instance.Symbol.Family:
-                family_name = instance.Symbol.Family.Name.lower()
-                section_keywords = ['section', 'callout', 'detail', 'marker']
-                if any(keyword in family_name for keyword in section_keywords):
-                    section_markers.append(instance)
-                    print("  Found section marker: {} - {}".format(instance.Id.Value, family_name))
-        except:
-            continue
-    
+    # Transform section markers (collected by get_marker_family_instances)
     print("Found {} section marker family instances".format(len(section_markers)))
     
     # V7 FIX: Same rotation amount as building (90°), not arbitrary 45°
     # Position: Move markers with translation only
     # Orientation: Rotate by SAME amount as building
-    marker_rotation_radians = math.radians(rotation_degrees)  # Same as building rotation
+    marker_rotation_radians = rotation_degrees * DEG_TO_RAD  # Same as building rotation
     
     print("V7 CORRECT FIX: Section markers rotate same amount as building")
     print("Building rotation: {}°, Section marker rotation: {}° (same as building)".format(
         rotation_degrees, rotation_degrees))
-    print("Building center: ({:.2f}, {:.2f}, {:.2f})".format(
-        building_center.X, building_center.Y, building_center.Z))
+    if building_center is not None:
+        print("Building center: ({:.2f}, {:.2f}, {:.2f})".format(
+            building_center.X, building_center.Y, building_center.Z))
+    else:
+        print("Building center: not used (translation only)")
     
     for marker in section_markers:
         try:
-            if marker.Location and hasattr(marker.Location, 'Point'):
+            marker_location = marker.Location
+            if type(marker_location) is DB.LocationPoint:
                 # Step 1: Move marker to new position (translation only, no rotation yet)
-                old_point = marker.Location.Point
+                old_point = marker_location.Point
                 # Apply only translation part of transform
                 translation_vector = transform.Origin
                 new_point = old_point.Add(translation_vector)
-                marker.Location.Point = new_point
-                print("  Section marker moved to ({:.2f}, {:.2f}, {:.2f})".format(
-                    new_point.X, new_point.Y, new_point.Z))
+                marker_location.Point = new_point
+                if DEBUG:
+                    print("  Section marker moved to ({:.2f}, {:.2f}, {:.2f})".format(
+                        new_point.X, new_point.Y, new_point.Z))
                 
                 # Step 2: V7 FIX - Rotate by building's rotation amount around marker center
                 marker_rotation_axis = DB.Line.CreateBound(
@@ -834,11 +1081,13 @@ def update_section_views_v3(document, transform, rotation_degrees, building_cent
                     DB.XYZ(new_point.X, new_point.Y, new_point.Z + 10)
                 )
                 
-                print("  V7 FIX: Rotating {}° around marker center ({:.2f}, {:.2f}) - same as building".format(
-                    rotation_degrees, new_point.X, new_point.Y))
+                if DEBUG:
+                    print("  V7 FIX: Rotating {}° around marker center ({:.2f}, {:.2f}) - same as building".format(
+                        rotation_degrees, new_point.X, new_point.Y))
                 
                 DB.ElementTransformUtils.RotateElement(document, marker.Id, marker_rotation_axis, marker_rotation_radians)
-                print("  Updated section marker: {} (rotated by building rotation amount)".format(marker.Id.Value))
+                if DEBUG:
+                    print("  Updated section marker: {} (rotated by building rotation amount)".format(marker.Id.Value))
         except Exception as e:
             print("  ERROR transforming section marker {}: {}".format(marker.Id.Value, str(e)))
             continue
@@ -848,11 +1097,13 @@ def update_section_views_v3(document, transform, rotation_degrees, building_cent
     # Update section views
     for view in section_views:
         try:
-            print("Processing section view: {}".format(view.Name))
+            if DEBUG:
+                print("Processing section view: {}".format(view.Name))
             
             # Skip view templates
-            if hasattr(view, 'IsTemplate') and view.IsTemplate:
-                print("  Skipping template view")
+            if view.IsTemplate:
+                if DEBUG:
+                    print("  Skipping template view")
                 continue
             
             view_updated = False
@@ -860,43 +1111,13 @@ def update_section_views_v3(document, transform, rotation_degrees, building_cent
             # Method 1: Update crop box if active
             if view.CropBoxActive:
                 try:
-                    print("  Updating crop box...")
-                    crop_box = view.CropBox
-                    if crop_box:
-                        # For section views, we need to transform the view origin AND direction
-                        # The crop box transform contains the view's coordinate system
-                        old_transform = crop_box.Transform
-                        
-                        # Transform the origin point
-                        new_origin = transform.OfPoint(old_transform.Origin)
-                        
-                        # Create new transform with moved origin AND rotated orientation
-                        new_transform = DB.Transform.Identity
-                        new_transform.Origin = new_origin
-                        
-                        # CRITICAL: Apply rotation to the view direction vectors
-                        if not transform.IsTranslation:
-                            # Transform the view direction vectors with the same rotation
-                            new_transform.BasisX = transform.OfVector(old_transform.BasisX)
-                            new_transform.BasisY = transform.OfVector(old_transform.BasisY) 
-                            new_transform.BasisZ = transform.OfVector(old_transform.BasisZ)
-                            print("    Applied rotation to section view direction vectors")
-                        else:
-                            # Translation only - keep original orientation
-                            new_transform.BasisX = old_transform.BasisX
-                            new_transform.BasisY = old_transform.BasisY
-                            new_transform.BasisZ = old_transform.BasisZ
-                        
-                        # Create new crop box with same size but new transform
-                        new_crop_box = DB.BoundingBoxXYZ()
-                        new_crop_box.Min = crop_box.Min
-                        new_crop_box.Max = crop_box.Max
-                        new_crop_box.Transform = new_transform
-                        
-                        view.CropBox = new_crop_box
+                    if DEBUG:
+                        print("  Updating crop box...")
+                    if transform_view_crop_box(view, transform):
                         updated_count += 1
                         view_updated = True
-                        print("  SUCCESS: Crop box updated")
+                        if DEBUG:
+                            print("  SUCCESS: Crop box updated")
                         
                 except Exception as crop_e:
                     print("  Crop box update failed: {}".format(str(crop_e)))
@@ -920,7 +1141,8 @@ def update_section_views_v3(document, transform, rotation_degrees, building_cent
                             view.SetSectionBox(new_section_box)
                             updated_count += 1
                             view_updated = True
-                            print("  SUCCESS: Section box updated")
+                            if DEBUG:
+                                print("  SUCCESS: Section box updated")
                             
                 except Exception as section_e:
                     print("  Section box method failed: {}".format(str(section_e)))
@@ -936,63 +1158,35 @@ def update_section_views_v3(document, transform, rotation_degrees, building_cent
     return updated_count
 
 
-def update_plan_views_v3(document, transform):
+def update_plan_views_v3(document, transform, plan_views):
     """
     V3 - More robust plan view updates 
+    plan_views are collected up front by get_crop_views
     """
     
-    plan_views = DB.FilteredElementCollector(document).OfClass(DB.ViewPlan).ToElements()
     print("Found {} plan views to process".format(len(plan_views)))
     updated_count = 0
     
     for view in plan_views:
         try:
-            print("Processing plan view: {}".format(view.Name))
+            if DEBUG:
+                print("Processing plan view: {}".format(view.Name))
             
             # Skip view templates
-            if hasattr(view, 'IsTemplate') and view.IsTemplate:
-                print("  Skipping template view")
+            if view.IsTemplate:
+                if DEBUG:
+                    print("  Skipping template view")
                 continue
                 
             if view.CropBoxActive:
-                print("  View has active crop box")
+                if DEBUG:
+                    print("  View has active crop box")
                 
                 try:
-                    crop_box = view.CropBox
-                    if crop_box:
-                        # For plan views, we need to transform the view origin AND direction  
-                        # The crop box transform contains the view's coordinate system
-                        old_transform = crop_box.Transform
-                        
-                        # Transform the origin point
-                        new_origin = transform.OfPoint(old_transform.Origin)
-                        
-                        # Create new transform with moved origin AND rotated orientation
-                        new_transform = DB.Transform.Identity
-                        new_transform.Origin = new_origin
-                        
-                        # CRITICAL: Apply rotation to the view direction vectors for plan views too
-                        if not transform.IsTranslation:
-                            # Transform the view direction vectors with the same rotation
-                            new_transform.BasisX = transform.OfVector(old_transform.BasisX)
-                            new_transform.BasisY = transform.OfVector(old_transform.BasisY) 
-                            new_transform.BasisZ = transform.OfVector(old_transform.BasisZ)
-                            print("    Applied rotation to plan view direction vectors")
-                        else:
-                            # Translation only - keep original orientation
-                            new_transform.BasisX = old_transform.BasisX
-                            new_transform.BasisY = old_transform.BasisY
-                            new_transform.BasisZ = old_transform.BasisZ
-                        
-                        # Create new crop box with same size but new transform
-                        new_crop_box = DB.BoundingBoxXYZ()
-                        new_crop_box.Min = crop_box.Min
-                        new_crop_box.Max = crop_box.Max
-                        new_crop_box.Transform = new_transform
-                        
-                        view.CropBox = new_crop_box
+                    if transform_view_crop_box(view, transform):
                         updated_count += 1
-                        print("  SUCCESS: Plan view crop box updated")
+                        if DEBUG:
+                            print("  SUCCESS: Plan view crop box updated")
                         continue
                         
                 except Exception as bbox_e:
@@ -1003,11 +1197,12 @@ def update_plan_views_v3(document, transform):
                     crop_manager = view.GetCropRegionShapeManager()
                     if crop_manager.CanHaveShape:
                         crop_manager.RemoveCropRegionShape()
-                        print("  Crop region reset - should adjust automatically")
+                        if DEBUG:
+                            print("  Crop region reset - should adjust automatically")
                         
                 except Exception as shape_e:
                     print("  Crop shape reset failed: {}".format(str(shape_e)))
-            else:
+            elif DEBUG:
                 print("  View does not have active crop box")
                         
         except Exception as e:
@@ -1018,127 +1213,179 @@ def update_plan_views_v3(document, transform):
     return updated_count
 
 
-def update_annotations_v3(document, transform):
+def update_annotations_v3(document, transform, annotation_ids, is_translation, rotation_degrees=0, rotation_origin=None):
     """
     V3 - Enhanced annotation updating with better error handling
+    annotation_ids are collected up front by get_model_elements
+    rotation_degrees/rotation_origin are the building rotation the transform was built from,
+    so rotated transforms can be replayed with bulk RotateElements + MoveElements
     """
     
-    annotation_categories = [
-        DB.BuiltInCategory.OST_Dimensions,
-        DB.BuiltInCategory.OST_TextNotes,
-        DB.BuiltInCategory.OST_Tags,
-        DB.BuiltInCategory.OST_GenericAnnotation,
-        DB.BuiltInCategory.OST_Callouts,  # Add callouts
-        DB.BuiltInCategory.OST_DetailComponents,  # Add detail components
-    ]
-    
-    all_annotations = []
-    for category in annotation_categories:
-        try:
-            elements = list(DB.FilteredElementCollector(document)
-                          .OfCategory(category)
-                          .WhereElementIsNotElementType()
-                          .ToElements())
-            all_annotations.extend(elements)
-            print("Found {} elements in category {}".format(len(elements), category))
-        except Exception as e:
-            print("Could not collect category {}: {}".format(category, str(e)))
-            continue
-    
-    print("Total annotations found: {}".format(len(all_annotations)))
+    print("Total annotations found: {}".format(len(annotation_ids)))
     
     # Try bulk transformation first (this worked before)
-    annotation_ids = [ann.Id for ann in all_annotations if ann.Id]
     if annotation_ids:
         try:
-            annotation_ids_list = List[DB.ElementId](annotation_ids)
-            if transform.IsTranslation:
-                DB.ElementTransformUtils.MoveElements(document, annotation_ids_list, transform.Origin)
+            if is_translation:
+                # Drop any annotations deleted while the model was transformed
+                annotation_ids = get_valid_elements(document, annotation_ids)
+                DB.ElementTransformUtils.MoveElements(document, annotation_ids, transform.Origin)
                 print("SUCCESS: Bulk moved {} annotations".format(len(annotation_ids)))
                 return len(annotation_ids)
-            else:
-                # For complex transforms, apply to each annotation individually
-                transformed_count = 0
-                for ann_id in annotation_ids:
-                    try:
-                        ann_elem = document.GetElement(ann_id)
-                        if ann_elem and ann_elem.Location:
-                            location = ann_elem.Location
-                            if hasattr(location, 'Point'):
-                                location.Point = transform.OfPoint(location.Point)
-                            elif hasattr(location, 'Curve'):
-                                curve = location.Curve
-                                start = transform.OfPoint(curve.GetEndPoint(0))
-                                end = transform.OfPoint(curve.GetEndPoint(1))
-                                location.Curve = DB.Line.CreateBound(start, end)
-                            transformed_count += 1
-                    except:
+            
+            if rotation_origin is not None:
+                annotation_ids = get_valid_elements(document, annotation_ids)
+                rotation_axis = DB.Line.CreateBound(rotation_origin, rotation_origin.Add(DB.XYZ.BasisZ))
+                # The rotation fixes its own origin, so whatever the combined transform
+                # does to that point is the translation part
+                translation = transform.OfPoint(rotation_origin).Subtract(rotation_origin)
+                
+                rotated = False
+                try:
+                    DB.ElementTransformUtils.RotateElements(
+                        document, annotation_ids, rotation_axis, rotation_degrees * DEG_TO_RAD)
+                    rotated = True
+                    if not translation.IsZeroLength():
+                        DB.ElementTransformUtils.MoveElements(document, annotation_ids, translation)
+                    print("SUCCESS: Bulk rotated {} annotations".format(len(annotation_ids)))
+                    return len(annotation_ids)
+                except Exception as rot_e:
+                    if rotated:
+                        # Rotation already applied - the per-element path would rotate twice
+                        print("WARNING: Bulk annotation move failed after rotation - "
+                              "{} annotations are rotated but NOT translated: {}".format(
+                                  len(annotation_ids), str(rot_e)))
+                        return 0
+                    print("Bulk annotation rotation failed, transforming individually: {}".format(str(rot_e)))
+            
+            # For complex transforms, apply to each annotation individually
+            # Chained dimensions and detail lines share endpoints - transform each once
+            point_cache = {}
+            
+            # Transform matrix read into plain floats once - OfPoint becomes local arithmetic
+            basis_x, basis_y, basis_z, origin = transform.BasisX, transform.BasisY, transform.BasisZ, transform.Origin
+            bxx, bxy, bxz = basis_x.X, basis_x.Y, basis_x.Z
+            byx, byy, byz = basis_y.X, basis_y.Y, basis_y.Z
+            bzx, bzy, bzz = basis_z.X, basis_z.Y, basis_z.Z
+            ox, oy, oz = origin.X, origin.Y, origin.Z
+            
+            def transform_point(point):
+                key = (point.X, point.Y, point.Z)
+                result = point_cache.get(key)
+                if result is None:
+                    x, y, z = key
+                    result = DB.XYZ(bxx * x + byx * y + bzx * z + ox,
+                                    bxy * x + byy * y + bzy * z + oy,
+                                    bxz * x + byz * y + bzz * z + oz)
+                    if len(point_cache) < POINT_CACHE_LIMIT:
+                        point_cache[key] = result
+                return result
+            
+            transformed_count = 0
+            valid_count = 0
+            failed_count = 0  # Counted, not printed per element - reported once below
+            for ann_id in annotation_ids:
+                try:
+                    # One GetElement per id - a None result doubles as the deleted-element check
+                    ann_elem = document.GetElement(ann_id)
+                    if ann_elem is None:
                         continue
-                print("SUCCESS: Bulk transformed {} annotations".format(len(annotation_ids)))
-                return len(annotation_ids)
+                    valid_count += 1
+                    location = ann_elem.Location
+                    if location:
+                        location_type = type(location)
+                        if location_type is DB.LocationPoint:
+                            location.Point = transform_point(location.Point)
+                        elif location_type is DB.LocationCurve:
+                            curve = location.Curve
+                            start = transform_point(curve.GetEndPoint(0))
+                            end = transform_point(curve.GetEndPoint(1))
+                            location.Curve = DB.Line.CreateBound(start, end)
+                        transformed_count += 1
+                except Exception:
+                    # Only the Location setters are expected to throw (pinned/constrained)
+                    failed_count += 1
+                    continue
+            print("SUCCESS: Transformed {}/{} annotations individually".format(transformed_count, valid_count))
+            if failed_count:
+                print("  {} annotations could not be transformed individually".format(failed_count))
+            return transformed_count
         except Exception as bulk_e:
             print("Bulk annotation transform failed: {}".format(str(bulk_e)))
     
     return 0
 
 
-def debug_transformation(document, transform, test_point=None):
-    """Debug transformation by testing on a known point - ENHANCED"""
-    
-    if test_point is None:
-        test_point = DB.XYZ(0, 0, 0)
-    
-    transformed_point = transform.OfPoint(test_point)
-    
-    print("=== TRANSFORMATION DEBUG ===")
-    print("Original point: ({}, {}, {})".format(test_point.X, test_point.Y, test_point.Z))
-    print("Transformed point: ({}, {}, {})".format(transformed_point.X, transformed_point.Y, transformed_point.Z))
-    print("Translation: ({}, {}, {})".format(
-        transformed_point.X - test_point.X,
-        transformed_point.Y - test_point.Y, 
-        transformed_point.Z - test_point.Z
-    ))
-    
-    # MEASURE ROTATION ANGLE
-    print("\n--- ROTATION ANALYSIS ---")
-    print("Transform Matrix:")
-    print("  BasisX: ({:.4f}, {:.4f}, {:.4f})".format(transform.BasisX.X, transform.BasisX.Y, transform.BasisX.Z))
-    print("  BasisY: ({:.4f}, {:.4f}, {:.4f})".format(transform.BasisY.X, transform.BasisY.Y, transform.BasisY.Z))
-    print("  BasisZ: ({:.4f}, {:.4f}, {:.4f})".format(transform.BasisZ.X, transform.BasisZ.Y, transform.BasisZ.Z))
-    
-    # Calculate actual rotation angle from matrix
-    rotation_angle_rad = math.atan2(transform.BasisX.Y, transform.BasisX.X)
-    rotation_angle_deg = math.degrees(rotation_angle_rad)
-    print("Rotation angle from BasisX: {:.2f} degrees".format(rotation_angle_deg))
-    
-    # Also check Y basis rotation
-    y_rotation_rad = math.atan2(-transform.BasisY.X, transform.BasisY.Y)
-    y_rotation_deg = math.degrees(y_rotation_rad)
-    print("Rotation angle from BasisY: {:.2f} degrees".format(y_rotation_deg))
-    
-    # Test rotation of unit vectors
-    unit_x = DB.XYZ(1, 0, 0)
-    unit_y = DB.XYZ(0, 1, 0)
-    rotated_x = transform.OfVector(unit_x)
-    rotated_y = transform.OfVector(unit_y)
-    print("\nUnit vector transformations:")
-    print("  X(1,0,0) -> ({:.4f}, {:.4f}, {:.4f})".format(rotated_x.X, rotated_x.Y, rotated_x.Z))
-    print("  Y(0,1,0) -> ({:.4f}, {:.4f}, {:.4f})".format(rotated_y.X, rotated_y.Y, rotated_y.Z))
+def debug_transformation(document, transform, test_point=None, verbose=False):
+    """
+    Debug transformation by testing on a known point - ENHANCED
+    verbose=True also inverts the transform and reports its determinant
+    """
+    
+    # Buffer report lines and emit them with a single print at the end
+    output_lines = []
+    log = output_lines.append
     
     try:
-        inverse_transform = transform.Inverse
-        print("\nTransform is invertible: True")
-    except:
-        print("\nTransform is invertible: False")
-    
-    print("Transform determinant: {}".format(transform.Determinant))
-    print("Is translation only: {}".format(transform.IsTranslation))
-    print("===========================")
+        if test_point is None:
+            test_point = DB.XYZ(0, 0, 0)
+        
+        transformed_point = transform.OfPoint(test_point)
+        
+        log("=== TRANSFORMATION DEBUG ===")
+        log("Original point: ({}, {}, {})".format(test_point.X, test_point.Y, test_point.Z))
+        log("Transformed point: ({}, {}, {})".format(transformed_point.X, transformed_point.Y, transformed_point.Z))
+        log("Translation: ({}, {}, {})".format(
+            transformed_point.X - test_point.X,
+            transformed_point.Y - test_point.Y, 
+            transformed_point.Z - test_point.Z
+        ))
+        
+        # MEASURE ROTATION ANGLE
+        log("\n--- ROTATION ANALYSIS ---")
+        log("Transform Matrix:")
+        log("  BasisX: ({:.4f}, {:.4f}, {:.4f})".format(transform.BasisX.X, transform.BasisX.Y, transform.BasisX.Z))
+        log("  BasisY: ({:.4f}, {:.4f}, {:.4f})".format(transform.BasisY.X, transform.BasisY.Y, transform.BasisY.Z))
+        log("  BasisZ: ({:.4f}, {:.4f}, {:.4f})".format(transform.BasisZ.X, transform.BasisZ.Y, transform.BasisZ.Z))
+        
+        # Calculate actual rotation angle from matrix
+        rotation_angle_rad = math.atan2(transform.BasisX.Y, transform.BasisX.X)
+        rotation_angle_deg = math.degrees(rotation_angle_rad)
+        log("Rotation angle from BasisX: {:.2f} degrees".format(rotation_angle_deg))
+        
+        # Also check Y basis rotation
+        y_rotation_rad = math.atan2(-transform.BasisY.X, transform.BasisY.Y)
+        y_rotation_deg = math.degrees(y_rotation_rad)
+        log("Rotation angle from BasisY: {:.2f} degrees".format(y_rotation_deg))
+        
+        # Test rotation of unit vectors
+        unit_x = DB.XYZ(1, 0, 0)
+        unit_y = DB.XYZ(0, 1, 0)
+        rotated_x = transform.OfVector(unit_x)
+        rotated_y = transform.OfVector(unit_y)
+        log("\nUnit vector transformations:")
+        log("  X(1,0,0) -> ({:.4f}, {:.4f}, {:.4f})".format(rotated_x.X, rotated_x.Y, rotated_x.Z))
+        log("  Y(0,1,0) -> ({:.4f}, {:.4f}, {:.4f})".format(rotated_y.X, rotated_y.Y, rotated_y.Z))
+        
+        # Inversion allocates a full new Transform - only worth it when asked for
+        if verbose:
+            try:
+                inverse_transform = transform.Inverse
+                log("\nTransform is invertible: True")
+            except Exception:
+                log("\nTransform is invertible: False")
+        
+            log("Transform determinant: {}".format(transform.Determinant))
+        log("Is translation only: {}".format(transform.IsTranslation))
+        log("===========================")
+    finally:
+        print("\n".join(output_lines))
 
 
-def calculate_building_center(document, element_ids):
+def calculate_building_center(document, element_ids, element_cache=None):
     """
     Calculate the center point of all building elements for rotation
+    Resolved elements are kept in element_cache for the transform step
     """
     if not element_ids:
         return DB.XYZ(0, 0, 0)
@@ -1146,22 +1393,31 @@ def calculate_building_center(document, element_ids):
     min_x = min_y = min_z = float('inf')
     max_x = max_y = max_z = float('-inf')
     valid_count = 0
+    if element_cache is None:
+        element_cache = {}
+    
+    # Local aliases keep the hot loop on fast local lookups
+    _min = min
+    _max = max
     
+    # Explicit None checks instead of try/except - no exception frame per element
     for element_id in element_ids:
-        try:
-            element = document.GetElement(element_id)
-            if element:
-                bbox = element.get_BoundingBox(None)
-                if bbox:
-                    min_x = min(min_x, bbox.Min.X)
-                    min_y = min(min_y, bbox.Min.Y)
-                    min_z = min(min_z, bbox.Min.Z)
-                    max_x = max(max_x, bbox.Max.X)
-                    max_y = max(max_y, bbox.Max.Y)
-                    max_z = max(max_z, bbox.Max.Z)
-                    valid_count += 1
-        except:
+        element = get_cached_element(document, element_id, element_cache)
+        if element is None:
             continue
+        bbox = element.get_BoundingBox(None)
+        if bbox is None:
+            continue
+        # Read each corner once - every .Min/.Max access crosses into .NET
+        bbox_min = bbox.Min
+        bbox_max = bbox.Max
+        min_x = _min(min_x, bbox_min.X)
+        min_y = _min(min_y, bbox_min.Y)
+        min_z = _min(min_z, bbox_min.Z)
+        max_x = _max(max_x, bbox_max.X)
+        max_y = _max(max_y, bbox_max.Y)
+        max_z = _max(max_z, bbox_max.Z)
+        valid_count += 1
     
     if valid_count == 0:
         return DB.XYZ(0, 0, 0)
@@ -1183,20 +1439,32 @@ def transform_model_and_views_v3(document, translation_vector, rotation_angle_de
     V3 - Enhanced transform with major elevation marker improvements
     """
     
-    # Get elements first to calculate proper rotation center
-    elements_to_transform = get_model_elements(document)
-    
-    if rotation_origin is None:
-        # Calculate the actual center of the building for rotation
-        rotation_origin = calculate_building_center(document, elements_to_transform)
-        print("Using calculated building center as rotation origin")
-    else:
-        print("Using provided rotation origin: ({:.2f}, {:.2f}, {:.2f})".format(
-            rotation_origin.X, rotation_origin.Y, rotation_origin.Z))
+    # Identity transform - nothing would move, so skip the model walk entirely
+    if translation_vector.IsZeroLength() and rotation_angle_degrees == 0:
+        print("No-op transform (zero translation, zero rotation) - nothing to do")
+        return True
     
-    rotation_angle_radians = math.radians(rotation_angle_degrees)
+    # Elements from the model collector are reused by the center and transform steps
+    element_cache = {}
+    rotation_angle_radians = rotation_angle_degrees * DEG_TO_RAD
     
     try:
+        # Get elements first to calculate proper rotation center
+        elements_to_transform, annotation_ids = get_model_elements(document, element_cache)
+        
+        if rotation_angle_degrees == 0:
+            # Pure translation - the center only feeds the rotation axis, so skip the bbox scan;
+            # None tells the rotation-only consumers there is no center
+            rotation_origin = None
+            print("No rotation - skipping building center calculation")
+        elif rotation_origin is None:
+            # Calculate the actual center of the building for rotation
+            rotation_origin = calculate_building_center(document, elements_to_transform, element_cache)
+            print("Using calculated building center as rotation origin")
+        else:
+            print("Using provided rotation origin: ({:.2f}, {:.2f}, {:.2f})".format(
+                rotation_origin.X, rotation_origin.Y, rotation_origin.Z))
+        
         # Create transformation matrix
         if rotation_angle_degrees != 0:
             rotation_transform = DB.Transform.CreateRotationAtPoint(
@@ -1207,51 +1475,63 @@ def transform_model_and_views_v3(document, translation_vector, rotation_angle_de
         else:
             combined_transform = DB.Transform.CreateTranslation(translation_vector)
         
-        # Debug the transformation
-        debug_transformation(document, combined_transform)
+        # Debug the transformation - diagnostic output only, skipped in normal runs
+        if DEBUG:
+            debug_transformation(document, combined_transform)
+        
+        if not elements_to_transform:
+            print("No elements found to transform!")
+            return False
+        
+        # Read-only marker and view scans stay outside the transaction to keep it short
+        elevation_families, section_markers = get_marker_family_instances(document)
+        section_views, plan_views = get_crop_views(document)
+        
+        # Constant for the whole transaction - the updaters take it instead of re-querying IsTranslation
+        is_translation = rotation_angle_degrees == 0
         
         with revit.Transaction("Enhanced Transform Model and Views - v3"):
             
             # 1. Transform model elements (using pre-gathered elements)
-            if elements_to_transform:
-                transformed_count = transform_elements_robust(document, elements_to_transform, combined_transform, rotation_angle_degrees, rotation_origin)
-                print("Successfully transformed {}/{} elements".format(transformed_count, len(elements_to_transform)))
-                
-                success_rate = float(transformed_count) / len(elements_to_transform)
-                print("Success rate: {:.1%} of elements transformed".format(success_rate))
-            else:
-                print("No elements found to transform!")
-                return False
+            transformed_count = transform_elements_robust(document, elements_to_transform, combined_transform,
+                                                          rotation_angle_degrees, rotation_origin, element_cache)
             
             # 2. Update views with V4 improvements - BUILDING CENTER ROTATION
             print("\n=== STARTING VIEW UPDATES ===")
-            elevation_count = update_elevation_markers_v3(document, combined_transform, rotation_angle_degrees, rotation_origin)
+            elevation_count = update_elevation_markers_v3(document, combined_transform, rotation_angle_degrees, rotation_origin,
+                                                          elevation_families, is_translation)
             
             # Regenerate document after elevation marker changes (recommended for view-dependent elements)
             print("Regenerating document after elevation marker updates...")
             document.Regenerate()
             
-            section_count = update_section_views_v3(document, combined_transform, rotation_angle_degrees, rotation_origin)
-            plan_count = update_plan_views_v3(document, combined_transform)
+            section_count = update_section_views_v3(document, combined_transform, rotation_angle_degrees, rotation_origin,
+                                                    section_markers, section_views)
+            plan_count = update_plan_views_v3(document, combined_transform, plan_views)
             
             # 3. Update annotations
-            annotation_count = update_annotations_v3(document, combined_transform)
-            
-            # Summary
-            print("\n=== TRANSFORMATION SUMMARY v3 ===")
-            print("Model elements: {}/{} transformed".format(transformed_count, len(elements_to_transform)))
-            print("ELEVATION MARKERS: {} updated *** KEY IMPROVEMENT ***".format(elevation_count))
-            print("Section views: {} updated".format(section_count))
-            print("Plan views: {} updated".format(plan_count))
-            print("Annotations: {} transformed".format(annotation_count))
-            print("=====================================")
+            annotation_count = update_annotations_v3(document, combined_transform, annotation_ids, is_translation,
+                                                     rotation_angle_degrees, rotation_origin)
+        
+        # Summary is reported after the transaction commits - keeps it out of the open transaction
+        success_rate = float(transformed_count) / len(elements_to_transform)
+        print("\n".join([
+            "\n=== TRANSFORMATION SUMMARY v3 ===",
+            "Model elements: {}/{} transformed".format(transformed_count, len(elements_to_transform)),
+            "Success rate: {:.1%} of elements transformed".format(success_rate),
+            "ELEVATION MARKERS: {} updated *** KEY IMPROVEMENT ***".format(elevation_count),
+            "Section views: {} updated".format(section_count),
+            "Plan views: {} updated".format(plan_count),
+            "Annotations: {} transformed".format(annotation_count),
+            "=====================================",
+        ]))
         
         print("Enhanced transformation v3 completed!")
         return True
         
     except Exception as e:
         print("Error during transformation: {}".format(str(e)))
-        import traceback
+        # Always print the full stack - runs are debugged remotely from this output
         print("Full traceback:")
         print(traceback.format_exc())
         return False